@@ -12,37 +12,52 @@ import re
 
 from rich.console import Console
 
+from jcode import response_cache
+from jcode.config import get_model_for_role
 from jcode.ollama_client import call_analyzer
-from jcode.prompts import ANALYZER_SYSTEM, ANALYZER_TASK
-from jcode.context import ContextManager
+from jcode.prompts import ANALYZER_SYSTEM, ANALYZER_TASK, prompt_digest
+from jcode.context import ContextManager, canonical_text
+from jcode.schemas import ANALYZER_FORMAT
 
 console = Console()
 
+# Reasoning blocks and ```json fences around a reply, compiled once
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE_RE = re.compile(r"```(?:json)?\s*\n?(.*?)```", re.DOTALL)
+_DECODER = json.JSONDecoder()
+
+# Root cause of the fallback diagnosis — such replies are never cached
+_UNPARSED_ROOT_CAUSE = "Could not parse analysis"
+
 
 def _extract_json(text: str) -> dict:
     """Extract JSON from analyzer output."""
-    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
-    fence = re.search(r"```(?:json)?\s*\n?(.*?)```", text, re.DOTALL)
+    # Fast path: structured output is already a bare JSON object
+    try:
+        obj = json.loads(text)
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
+
+    text = _THINK_RE.sub("", text)
+    fence = _FENCE_RE.search(text)
     if fence:
         text = fence.group(1).strip()
 
-    depth = 0
-    start = None
-    for i, ch in enumerate(text):
-        if ch == "{":
-            if depth == 0:
-                start = i
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0 and start is not None:
-                try:
-                    return json.loads(text[start : i + 1])
-                except json.JSONDecodeError:
-                    continue
+    # Decode an object at each '{' in turn; the first that parses wins
+    i = text.find("{")
+    while i != -1:
+        try:
+            obj, _ = _DECODER.raw_decode(text, i)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+        i = text.find("{", i + 1)
 
     return {
-        "root_cause": "Could not parse analysis",
+        "root_cause": _UNPARSED_ROOT_CAUSE,
         "affected_file": "",
         "affected_function": None,
         "fix_strategy": text[:500],
@@ -70,34 +85,48 @@ def analyze_error(
         }
     """
     file_content = ctx.state.files.get(file_path, "")
-    previous_fixes = ctx.get_failure_log_str(file_path)
+    # Whole section, left out until this file has failed before
+    previous_fixes = ""
+    if any(e["file"] == file_path for e in ctx.state.failure_log):
+        previous_fixes = f"## Previous Fix Attempts\n{ctx.get_failure_log_str(file_path)}\n\n"
 
-    ctx.reset_channel("analyzer")
-    ctx.add_message("analyzer", "system", ANALYZER_SYSTEM)
-
-    prompt = ANALYZER_TASK.format(
+    prompt = ANALYZER_TASK.render(
         architecture=ctx.get_architecture(),
         error_output=error_output[-2000:],  # Last 2k chars of error
         file_path=file_path,
-        file_content=file_content[:8000],
+        file_content=canonical_text(file_content)[:8000],
         previous_fixes=previous_fixes,
     )
-    ctx.add_message("analyzer", "user", prompt)
-
-    console.print(f"  [dim]Analyzing error in[/dim] [cyan]{file_path}[/cyan]")
 
     planner_ctx, _ = ctx.get_context_sizes()
     complexity = ctx.get_complexity()
     size = ctx.get_size()
-    raw = call_analyzer(
-        ctx.get_messages("analyzer"),
-        stream=False,  # Analysis doesn't need streaming
-        num_ctx=planner_ctx,
-        complexity=complexity,
-        size=size,
+
+    cache_key = response_cache.cache_key(
+        "analyzer", get_model_for_role("analyzer", complexity, size),
+        prompt_digest("ANALYZER_SYSTEM"), prompt,
     )
+    raw = response_cache.get(cache_key)
+
+    if raw is not None:
+        console.print(f"  [dim]Analyzing error in[/dim] [cyan]{file_path}[/cyan] [dim](cached)[/dim]")
+    else:
+        ctx.replace_last_user("analyzer", ANALYZER_SYSTEM, prompt)
+
+        console.print(f"  [dim]Analyzing error in[/dim] [cyan]{file_path}[/cyan]")
+
+        raw = call_analyzer(
+            ctx.get_messages("analyzer"),
+            stream=False,  # Analysis doesn't need streaming
+            num_ctx=planner_ctx,
+            complexity=complexity,
+            size=size,
+            format=ANALYZER_FORMAT,
+        )
 
     result = _extract_json(raw)
+    if result.get("root_cause") != _UNPARSED_ROOT_CAUSE:
+        response_cache.put(cache_key, raw)
 
     # Display analysis
     console.print(f"    [dim]Root cause:[/dim] {result.get('root_cause', 'Unknown')}")
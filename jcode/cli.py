@@ -44,14 +44,27 @@ from jcode.executor import set_autonomous
 from jcode.web import set_internet_access, web_search, fetch_page, search_and_summarize, research_task, is_internet_allowed
 from jcode.prompts import (
     CHAT_SYSTEM, CHAT_CONTEXT, AGENTIC_SYSTEM, AGENTIC_TASK,
-    RESEARCH_SYSTEM, RESEARCH_TASK, PLANNER_RESEARCH_CONTEXT,
+    PLANNER_RESEARCH_CONTEXT,
+    FILE_BLOCK_RE, FILE_FENCED_RE, FILE_MARKER_RE, COMMAND_BLOCK_RE,
 )
 from jcode.intent import _BUILD_PATTERNS
-from jcode.scanner import scan_project, detect_project_type, scan_files
+from jcode.scanner import scan_project, detect_project_type, scan_files, walk_files
 from jcode import git_manager
 
 console = Console()
 
+# Display clean-up: strip file/command blocks out of a response before
+# rendering it. Looser than the parsing patterns on purpose.
+_DISPLAY_FILE_BLOCK_RE = re.compile(r"===FILE:.*?===END===", re.DOTALL)
+_DISPLAY_FILE_RAW_RE = re.compile(
+    r"===FILE:\s*.+?\s*===[ \t]*\n.*?(?=\n===(?:FILE|RUN|BACKGROUND)|$)", re.DOTALL,
+)
+_DISPLAY_HEADING_BLOCK_RE = re.compile(
+    r"\n#{1,4}\s+(?:FILE[:\s]+)?[a-zA-Z0-9_/. -]+\.[a-zA-Z0-9]+[ \t]*\n```\w*[ \t]*\n.*?\n```",
+    re.DOTALL,
+)
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+
 # ═══════════════════════════════════════════════════════════════════
 # ASCII Art
 # ═══════════════════════════════════════════════════════════════════
@@ -666,7 +679,7 @@ def _cmd_build(
     # For heavy tasks with research, augment the planning prompt
     plan_prompt = prompt
     if research_brief and not research_brief.startswith("["):
-        plan_prompt = prompt + PLANNER_RESEARCH_CONTEXT.format(research_brief=research_brief[:8000])
+        plan_prompt = prompt + PLANNER_RESEARCH_CONTEXT.render(research_brief=research_brief[:8000])
 
     plan = create_plan(plan_prompt, ctx)
     ctx.set_plan(plan)
@@ -781,28 +794,23 @@ def _cmd_agentic(
     # ── Step 2: Refresh context from disk ──
     _scan_project_files(ctx, project_dir)
 
-    # Build file contents string
-    file_parts = []
-    for path, content in sorted(ctx.state.files.items()):
-        trimmed = content[:6000]
-        file_parts.append(f"### {path}\n```\n{trimmed}\n```")
-    file_contents = "\n\n".join(file_parts) if file_parts else "(no files yet)"
+    # File index for every file; full text only for a budgeted selection
+    file_index, file_contents = ctx.get_agentic_file_context(user_request)
 
-    # Project summary
-    project_summary = ctx.get_project_summary_for_chat()
+    # Project summary (files are listed in the index instead)
+    project_summary = ctx.get_project_summary_for_chat(include_files=False)
 
-    # Git status
+    # Git status — a whole section, left out when the tree is clean or untracked
     git_status = ""
     if git_manager.git_available() and git_manager.is_git_repo(project_dir):
         changed = git_manager.changed_files(project_dir)
         if changed:
-            git_status = f"Modified files: {', '.join(changed[:20])}"
-        else:
-            git_status = "Clean working tree"
+            git_status = f"## Git Status\nModified files: {', '.join(changed[:20])}\n\n"
 
     # ── Step 3: Build prompt and call model with proper routing ──
-    full_prompt = AGENTIC_TASK.format(
+    full_prompt = AGENTIC_TASK.render(
         project_summary=project_summary,
+        file_index=file_index,
         file_contents=file_contents,
         user_request=user_request,
         git_status=git_status,
@@ -832,26 +840,17 @@ def _cmd_agentic(
     # even when the parser matched a different format from what the stripper expects.
     display_text = response
     # Remove ===FILE:...===END=== blocks
-    display_text = re.sub(r"===FILE:.*?===END===", "", display_text, flags=re.DOTALL)
+    display_text = _DISPLAY_FILE_BLOCK_RE.sub("", display_text)
     # Remove ===FILE: path=== + ``` block
-    display_text = re.sub(
-        r"===FILE:\s*.+?\s*===[ \t]*\n```\w*[ \t]*\n.*?\n```",
-        "", display_text, flags=re.DOTALL
-    )
+    display_text = FILE_FENCED_RE.sub("", display_text)
     # Remove remaining ===FILE: path=== blocks (raw content fallback)
-    display_text = re.sub(
-        r"===FILE:\s*.+?\s*===[ \t]*\n.*?(?=\n===(?:FILE|RUN|BACKGROUND)|$)",
-        "", display_text, flags=re.DOTALL
-    )
+    display_text = _DISPLAY_FILE_RAW_RE.sub("", display_text)
     # Remove markdown headings that are just file paths (### FILE: path)
-    display_text = re.sub(
-        r"\n#{1,4}\s+(?:FILE[:\s]+)?[a-zA-Z0-9_/. -]+\.[a-zA-Z0-9]+[ \t]*\n```\w*[ \t]*\n.*?\n```",
-        "", display_text, flags=re.DOTALL
-    )
+    display_text = _DISPLAY_HEADING_BLOCK_RE.sub("", display_text)
     # Remove ===RUN:=== and ===BACKGROUND:=== lines
-    display_text = re.sub(r"===(RUN|BACKGROUND):\s*.+?===", "", display_text, flags=re.IGNORECASE)
+    display_text = COMMAND_BLOCK_RE.sub("", display_text)
     # Collapse multiple blank lines
-    display_text = re.sub(r"\n{3,}", "\n\n", display_text).strip()
+    display_text = _BLANK_RUN_RE.sub("\n\n", display_text).strip()
 
     if files_written > 0:
         _log("APPLIED", f"Modified {files_written} file(s)")
@@ -944,21 +943,22 @@ def _agentic_auto_run(
         _log("AUTO-FIX", "Re-running after fix...")
 
 
+_RESCAN_SKIP_DIRS = frozenset({".git", "node_modules", ".venv", "__pycache__", ".next", "dist", "build"})
+
+
 def _scan_project_files(ctx: ContextManager, project_dir: Path) -> None:
     """Scan project directory and load file contents into context."""
     if not project_dir.exists():
         return
-    skip_dirs = {".git", "node_modules", ".venv", "__pycache__", ".next", "dist", "build"}
-    for f in project_dir.rglob("*"):
-        if f.is_file() and not f.name.startswith("."):
-            if any(part in skip_dirs for part in f.relative_to(project_dir).parts):
-                continue
-            try:
-                rel = str(f.relative_to(project_dir))
-                content = f.read_text(errors="replace")
-                ctx.record_file(rel, content)
-            except Exception:
-                pass
+    # Skipped directories are pruned during the walk, not filtered after it
+    for rel, entry in walk_files(str(project_dir), _RESCAN_SKIP_DIRS):
+        if entry.name.startswith("."):
+            continue
+        try:
+            content = Path(entry.path).read_text(errors="replace")
+            ctx.record_file(rel, content)
+        except Exception:
+            pass
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -979,7 +979,8 @@ def _run_fix_prompt(ctx: ContextManager, project_dir: Path, fix_prompt: str) ->
         file_parts.append(f"### {path}\n```\n{trimmed}\n```")
     file_contents = "\n\n".join(file_parts) if file_parts else "(no files yet)"
 
-    full_prompt = f"{fix_prompt}\n\n## All Project Files\n{file_contents}"
+    # Project files first (stable across fix attempts), error-specific prompt last
+    full_prompt = f"## All Project Files\n{file_contents}\n\n{fix_prompt}"
 
     _log("FIX", "Generating fix...")
     messages = [
@@ -1012,12 +1013,10 @@ def _cmd_chat(ctx: ContextManager, project_dir: Path, user_message: str) -> None
     # Refresh file contents from disk (read-only context)
     _scan_project_files(ctx, project_dir)
 
-    # Build file contents string (all files, capped per file)
-    file_parts = []
-    for path, content in sorted(ctx.state.files.items()):
-        trimmed = content[:6000]
-        file_parts.append(f"### {path}\n```\n{trimmed}\n```")
-    file_contents = "\n\n".join(file_parts) if file_parts else "(no files yet)"
+    # Build file contents string (all files; large .py files as skeletons).
+    # Files the user names go in full near the end, keeping the listing stable.
+    file_contents = ctx.iter_chat_file_contents()
+    referenced_files = ctx.get_referenced_file_contents(user_message)
 
     # Build chat history string (last 20 messages)
     chat_lines = []
@@ -1028,12 +1027,13 @@ def _cmd_chat(ctx: ContextManager, project_dir: Path, user_message: str) -> None
 
     # Build the prompt
     project_summary = ctx.get_project_summary_for_chat()
-    full_prompt = CHAT_CONTEXT.format(
+    full_prompt = "".join(CHAT_CONTEXT.iter_render(
         project_summary=project_summary,
         file_contents=file_contents,
         chat_history=chat_history_str,
+        referenced_files=referenced_files,
         user_message=user_message,
-    )
+    ))
 
     # Record user message
     ctx.add_chat("user", user_message)
@@ -1048,12 +1048,8 @@ def _cmd_chat(ctx: ContextManager, project_dir: Path, user_message: str) -> None
     response = call_model("coder", messages, stream=True)
 
     # Display the response (strip any ===FILE:=== or ===RUN:=== blocks — chat mode is read-only)
-    display_text = re.sub(
-        r"===FILE:.*?===END===", "", response, flags=re.DOTALL
-    ).strip()
-    display_text = re.sub(
-        r"===(RUN|BACKGROUND):\s*.+?===", "", display_text, flags=re.IGNORECASE
-    ).strip()
+    display_text = _DISPLAY_FILE_BLOCK_RE.sub("", response).strip()
+    display_text = COMMAND_BLOCK_RE.sub("", display_text).strip()
 
     if display_text:
         console.print()
@@ -1127,28 +1123,18 @@ def _apply_file_changes(response: str, project_dir: Path, ctx: ContextManager) -
         return True
 
     # ── FORMAT 1: ===FILE: path=== ... ===END=== ─────────────────
-    for rel_path, content in re.findall(
-        r"===FILE:\s*(.+?)\s*===[ \t]*\n(.*?)===END===",
-        response, re.DOTALL
-    ):
-        if _write(rel_path, content):
+    for m in FILE_BLOCK_RE.finditer(response):
+        if _write(m["path"], m["body"]):
             files_written += 1
 
     # ── FORMAT 2: ===FILE: path=== followed by ``` block ─────────
-    fmt2 = re.compile(
-        r"===FILE:\s*(.+?)\s*===[ \t]*\n"
-        r"```\w*[ \t]*\n"
-        r"(.*?)"
-        r"\n```",
-        re.DOTALL,
-    )
-    for m in fmt2.finditer(response):
-        if _write(m.group(1), m.group(2)):
+    for m in FILE_FENCED_RE.finditer(response):
+        if _write(m["path"], m["body"]):
             files_written += 1
 
     # ── FORMAT 4: ===FILE: path=== + raw content (ultimate fallback) ─
     if not written_paths:
-        markers = list(re.finditer(r"===FILE:\s*(.+?)\s*===[ \t]*\n", response))
+        markers = list(FILE_MARKER_RE.finditer(response))
         for i, m in enumerate(markers):
             start = m.end()
             if i + 1 < len(markers):
@@ -1156,7 +1142,7 @@ def _apply_file_changes(response: str, project_dir: Path, ctx: ContextManager) -
             else:
                 nxt = re.search(r"\n===(RUN|BACKGROUND):", response[start:])
                 end = start + nxt.start() if nxt else len(response)
-            if _write(m.group(1), response[start:end]):
+            if _write(m["path"], response[start:end]):
                 files_written += 1
 
     # ── FORMAT 3 & 5: Markdown headings + code block ─────────────
@@ -1202,8 +1188,7 @@ def _apply_run_commands(response: str, project_dir: Path) -> int:
     commands_run = 0
 
     # Find all ===RUN:=== and ===BACKGROUND:=== blocks in order
-    pattern = re.compile(r"===(RUN|BACKGROUND):\s*(.+?)\s*===", re.IGNORECASE)
-    matches = list(pattern.finditer(response))
+    matches = list(COMMAND_BLOCK_RE.finditer(response))
 
     if not matches:
         return 0
@@ -1211,8 +1196,8 @@ def _apply_run_commands(response: str, project_dir: Path) -> int:
     _log("EXEC", f"Running {len(matches)} command(s)")
 
     for m in matches:
-        cmd_type = m.group(1).upper()
-        cmd = m.group(2).strip()
+        cmd_type = m["kind"].upper()
+        cmd = m["cmd"].strip()
 
         if not cmd:
             continue
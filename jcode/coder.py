@@ -7,12 +7,14 @@ v2.0 — Supports parallel generation via silent mode for WorkerPool.
 
 from __future__ import annotations
 
+import functools
 import re
 
 from rich.console import Console
 
-from jcode.ollama_client import call_coder, call_model_silent
-from jcode.prompts import CODER_SYSTEM, CODER_TASK, CODER_PATCH
+from jcode.config import MAX_WORKERS, PROMPT_CHARS_PER_TOKEN
+from jcode.ollama_client import call_coder, call_model_silent, call_models_parallel
+from jcode.prompts import CODER_SYSTEM, CODER_TASK, CODER_PATCH, CODER_PATCH_FOLLOWUP
 from jcode.context import ContextManager
 
 console = Console()
@@ -39,16 +41,8 @@ def _strip_fences(text: str) -> str:
     return text
 
 
-def generate_file(task: dict, ctx: ContextManager, parallel: bool = False) -> str:
-    """
-    Generate complete file content from a task.
-    Uses architecture summary + file index instead of full plan JSON.
-
-    Args:
-        task: Task dict with 'file', 'description', 'depends_on' keys.
-        ctx: The ContextManager for structured memory access.
-        parallel: If True, use silent (non-streaming) generation for thread safety.
-    """
+def _generation_prompt(task: dict, ctx: ContextManager) -> str:
+    """CODER_TASK prompt for *task*: dependency slices plus RAG context."""
     file_path = task["file"]
     description = task["description"]
 
@@ -68,12 +62,7 @@ def generate_file(task: dict, ctx: ContextManager, parallel: bool = False) -> st
     if rag_context:
         existing_context += f"\n\n## Semantically Related (from memory)\n{rag_context}"
 
-    # Build messages with structured memory
-    messages = [
-        {"role": "system", "content": CODER_SYSTEM},
-    ]
-
-    prompt = CODER_TASK.format(
+    return CODER_TASK(
         architecture=ctx.get_architecture(),
         file_index=ctx.get_file_index_str(),
         spec_details=ctx.get_spec_details(),
@@ -81,7 +70,27 @@ def generate_file(task: dict, ctx: ContextManager, parallel: bool = False) -> st
         task_description=description,
         existing_context=existing_context,
     )
-    messages.append({"role": "user", "content": prompt})
+
+
+def _generation_messages(task: dict, ctx: ContextManager) -> list[dict[str, str]]:
+    return [
+        {"role": "system", "content": CODER_SYSTEM},
+        {"role": "user", "content": _generation_prompt(task, ctx)},
+    ]
+
+
+def generate_file(task: dict, ctx: ContextManager, parallel: bool = False) -> str:
+    """
+    Generate complete file content from a task.
+    Uses architecture summary + file index instead of full plan JSON.
+
+    Args:
+        task: Task dict with 'file', 'description', 'depends_on' keys.
+        ctx: The ContextManager for structured memory access.
+        parallel: If True, use silent (non-streaming) generation for thread safety.
+    """
+    file_path = task["file"]
+    prompt = _generation_prompt(task, ctx)
 
     _, coder_ctx = ctx.get_context_sizes()
     complexity = ctx.get_complexity()
@@ -89,11 +98,16 @@ def generate_file(task: dict, ctx: ContextManager, parallel: bool = False) -> st
 
     if parallel:
         # Silent mode for parallel workers — no streaming, no coder_history mutation
+        messages = [
+            {"role": "system", "content": CODER_SYSTEM},
+            {"role": "user", "content": prompt},
+        ]
         console.print(f"  [dim]⚡ Generating[/dim] [cyan]{file_path}[/cyan]")
         raw = call_model_silent("coder", messages, num_ctx=coder_ctx, complexity=complexity, size=size)
     else:
         # Sequential mode with streaming
         ctx.reset_coder_history()
+        ctx.coder_session_file = file_path
         ctx.add_coder_message("system", CODER_SYSTEM)
         ctx.add_coder_message("user", prompt)
         console.print(f"\n  [dim]Generating[/dim] [cyan]{file_path}[/cyan]\n")
@@ -105,6 +119,41 @@ def generate_file(task: dict, ctx: ContextManager, parallel: bool = False) -> st
     return content
 
 
+def generate_files(tasks: list[dict], ctx: ContextManager) -> dict[str, str]:
+    """
+    Generate several independent files concurrently (one wave).
+
+    The coder calls run on one asyncio event loop via call_models_parallel,
+    at most MAX_WORKERS in flight. Each prompt is built only when its call
+    gets a slot. Results are recorded in ctx here, on the calling thread.
+
+    Returns:
+        {file_path: content}
+    """
+    _, coder_ctx = ctx.get_context_sizes()
+    complexity = ctx.get_complexity()
+    size = ctx.get_size()
+
+    requests = []
+    for task in tasks:
+        console.print(f"  [dim]⚡ Generating[/dim] [cyan]{task['file']}[/cyan]")
+        requests.append({
+            "role": "coder",
+            "messages": functools.partial(_generation_messages, task, ctx),
+            "num_ctx": coder_ctx,
+            "complexity": complexity,
+            "size": size,
+        })
+    raws = call_models_parallel(requests, max_concurrency=MAX_WORKERS)
+
+    results: dict[str, str] = {}
+    for task, raw in zip(tasks, raws):
+        content = _strip_fences(raw)
+        ctx.record_file(task["file"], content)
+        results[task["file"]] = content
+    return results
+
+
 def patch_file(
     file_path: str,
     error: str,
@@ -116,23 +165,50 @@ def patch_file(
     Apply a targeted, minimal patch to an existing file.
     This is the key differentiator — small diffs, not full rewrites.
 
+    In sequential mode, repeat patches to the same file continue the
+    existing coder conversation with CODER_PATCH_FOLLOWUP, which leaves out
+    the architecture already sent in that conversation's first turn. That
+    only happens while the whole history, the follow-up and room for a
+    rewritten file fit in num_ctx; otherwise Ollama would drop the oldest
+    turn (the one holding the architecture), so the conversation restarts
+    with the full CODER_PATCH prompt.
+
     Args:
         parallel: If True, use silent (non-streaming) generation.
     """
     file_content = ctx.state.files.get(file_path, "")
-
-    prompt = CODER_PATCH.format(
-        architecture=ctx.get_architecture(),
-        file_path=file_path,
-        file_content=file_content,
-        error=error,
-        review_feedback=review_feedback or "(no reviewer feedback)",
-    )
+    # Whole section, left out when there is no feedback
+    review_feedback = f"## Reviewer Feedback\n{review_feedback}\n\n" if review_feedback else ""
 
     _, coder_ctx = ctx.get_context_sizes()
     complexity = ctx.get_complexity()
     size = ctx.get_size()
 
+    followup = (
+        not parallel
+        and ctx.coder_session_file == file_path
+        and len(ctx.coder_history) > 0
+    )
+    if followup:
+        prompt = CODER_PATCH_FOLLOWUP(
+            file_path=file_path,
+            file_content=file_content,
+            error=error,
+            review_feedback=review_feedback,
+        )
+        # History + follow-up + the rewritten file the reply will carry
+        chars = sum(len(m["content"]) for m in ctx.coder_history)
+        chars += len(prompt) + len(file_content)
+        followup = -(-chars // PROMPT_CHARS_PER_TOKEN) <= coder_ctx
+    if not followup:
+        prompt = CODER_PATCH(
+            architecture=ctx.get_architecture(),
+            file_path=file_path,
+            file_content=file_content,
+            error=error,
+            review_feedback=review_feedback,
+        )
+
     if parallel:
         messages = [
             {"role": "system", "content": CODER_SYSTEM},
@@ -141,8 +217,10 @@ def patch_file(
         console.print(f"  [dim]⚡ Patching[/dim] [cyan]{file_path}[/cyan]")
         raw = call_model_silent("coder", messages, num_ctx=coder_ctx, complexity=complexity, size=size)
     else:
-        ctx.reset_coder_history()
-        ctx.add_coder_message("system", CODER_SYSTEM)
+        if not followup:
+            ctx.reset_coder_history()
+            ctx.coder_session_file = file_path
+            ctx.add_coder_message("system", CODER_SYSTEM)
         ctx.add_coder_message("user", prompt)
         console.print(f"\n  [dim]Patching[/dim] [cyan]{file_path}[/cyan]\n")
         raw = call_coder(ctx.get_coder_messages(), stream=True, num_ctx=coder_ctx, complexity=complexity, size=size)
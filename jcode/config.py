@@ -291,9 +291,14 @@ def refresh_local_models() -> set[str]:
     return _get_local_models()
 
 
-def pull_model(model_name: str) -> bool:
+def pull_model(model_name: str, show_progress: bool = True) -> bool:
     """Pull a model from Ollama registry.
     
+    Args:
+        model_name: Model to pull.
+        show_progress: Render a live progress bar. Disable when several
+            pulls run concurrently — rich only supports one live display.
+
     Returns:
         True if successful, False if failed or cancelled.
     """
@@ -304,6 +309,17 @@ def pull_model(model_name: str) -> bool:
         from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, DownloadColumn, TransferSpeedColumn
         
         console = Console()
+
+        if not show_progress:
+            try:
+                for _ in _ollama.pull(model_name, stream=True):
+                    pass
+                console.print(f"[green]✓ Pulled {model_name}[/green]")
+                refresh_local_models()
+                return True
+            except KeyboardInterrupt:
+                console.print(f"\n[yellow]⚠ Cancelled pulling {model_name}[/yellow]")
+                return False
         
         progress = Progress(
             SpinnerColumn(),
@@ -631,6 +647,7 @@ REVIEWER_OPTIONS = {
     "temperature": 0.3,
     "top_p": 0.9,
     "num_ctx": 4096,
+    "num_predict": 2048,      # Verdicts are short JSON — cap runaway output (a full batch fits)
 }
 
 ANALYZER_OPTIONS = {
@@ -666,6 +683,47 @@ SIZE_SCALING = {
     "large":  2.5,
 }
 
+# ── Ollama Client Settings ─────────────────────────────────────────
+# Bounded latency: a hung server fails fast into the retry path instead of
+# stalling a whole wave. The read timeout covers a full non-streaming
+# generation on local hardware, so it is looser than a hosted-API budget.
+OLLAMA_CONNECT_TIMEOUT = 5.0
+OLLAMA_READ_TIMEOUT = 300.0
+OLLAMA_WRITE_TIMEOUT = 10.0
+OLLAMA_POOL_TIMEOUT = 5.0
+# How long Ollama keeps a model (and its KV prefix cache) loaded after a call.
+# Its 5m default can unload the reviewer between waves of a long build.
+OLLAMA_KEEP_ALIVE = "30m"
+# Constrain planner/reviewer/analyzer replies with Ollama's format=<JSON schema>
+# (needs Ollama >= 0.5). Disable to rely on the prompt-embedded schema only.
+STRUCTURED_OUTPUT = True
+
+# ── Response Cache ─────────────────────────────────────────────────
+# Exact-match cache for reviewer/analyzer replies: a retry that regenerates
+# a byte-identical file gets the previous verdict without a model call.
+RESPONSE_CACHE = True
+RESPONSE_CACHE_SIZE = 512                       # In-memory LRU entries
+RESPONSE_CACHE_DB = Path.home() / ".jcode" / "response_cache.db"
+RESPONSE_CACHE_MAX_AGE = 7 * 24 * 3600          # Seconds before an on-disk entry expires
+
+# ── Web Cache ──────────────────────────────────────────────────────
+# Pages fetched by web.py (searches, docs, results) are reused for a while,
+# in memory and as gzip files on disk. Official-docs pages change rarely.
+# Files older than the longer TTL are deleted on a session's first write.
+WEB_CACHE = True
+WEB_CACHE_SIZE = 128                            # In-memory LRU entries
+WEB_CACHE_DIR = Path.home() / ".jcode" / "web_cache"
+WEB_CACHE_TTL = 3600                            # Seconds, search results / other pages
+WEB_CACHE_DOCS_TTL = 24 * 3600                  # Seconds, _TECH_DOCS hosts
+
+# ── Scan Cache ─────────────────────────────────────────────────────
+# scan_project stores the file index and dependency graph per project, keyed
+# by every scanned file's path, size and mtime; an unchanged tree reuses them
+# instead of re-parsing every file. File contents are never cached.
+SCAN_CACHE = True
+SCAN_CACHE_DIR = Path.home() / ".jcode" / "scan_cache"
+SCAN_CACHE_MAX_AGE = 30 * 24 * 3600             # Seconds before an unrewritten entry is pruned
+
 # ── Worker Pool Settings ───────────────────────────────────────────
 MAX_WORKERS = 4
 MIN_WORKERS = 1
@@ -676,8 +734,29 @@ WORKER_POLL_INTERVAL = 2.0
 # ── Limits ─────────────────────────────────────────────────────────
 MAX_ITERATIONS = 10
 MAX_FILE_READ_CHARS = 12000
+MAX_CHAT_FILE_CHARS = 6000    # Per-file cap in chat context; larger .py files become skeletons
+AGENTIC_CONTEXT_MAX_CHARS = 40000  # File contents per agentic prompt; larger projects send a selection
+AGENTIC_RETRIEVE_TOP_K = 6     # Files pulled from vector memory when the project doesn't fit
 MAX_TASK_FAILURES = 5
 MAX_DIFF_LINES = 80
+REVIEW_BATCH_SIZE = 8          # Files per batched reviewer call
+REVIEW_BATCH_MAX_CHARS = 24000 # Prompt budget per batched reviewer call
+REVIEW_SKIP_DATA_CHARS = 2000  # Config/data files up to this size that parse are auto-approved
+REVIEW_SKIP_PY_CHARS = 500     # ...and Python stubs (imports/constants only) up to this size
+PROMPT_CHARS_PER_TOKEN = 4     # Heuristic for local-model tokenizers
+
+# Estimated-token ceilings for the static system prompts; a prompt that
+# grows past its budget triggers a warning when first loaded
+PROMPT_TOKEN_BUDGETS: dict[str, int] = {
+    "PLANNER_SYSTEM": 800,
+    "CODER_SYSTEM": 500,
+    "REVIEWER_SYSTEM": 300,
+    "ANALYZER_SYSTEM": 250,
+    "CHAT_SYSTEM": 800,
+    "AGENTIC_SYSTEM": 1000,
+    "RESEARCH_SYSTEM": 300,
+    "GIT_COMMIT_MSG_SYSTEM": 150,
+}
 
 # ── Project Defaults ───────────────────────────────────────────────
 DEFAULT_OUTPUT_DIR = Path.cwd()
@@ -10,20 +10,103 @@ v2.0 — Thread-safe file recording for parallel generation.
 
 from __future__ import annotations
 
+import ast
 import json
+import re
 import threading
+from collections.abc import Iterator
 from pathlib import Path
 from datetime import datetime
 
 from jcode.config import (
     ProjectState, TaskNode, TaskStatus,
-    MAX_FILE_READ_CHARS, detect_complexity, get_context_size,
+    MAX_FILE_READ_CHARS, MAX_CHAT_FILE_CHARS, AGENTIC_CONTEXT_MAX_CHARS,
+    AGENTIC_RETRIEVE_TOP_K, detect_complexity, get_context_size,
 )
 from jcode.memory import ProjectMemory
 
 # Thread lock for state mutations (file recording, failure logging)
 _state_lock = threading.Lock()
 
+# Anything canonical_text() would change: a CR, or whitespace ending a line
+_WS_NOISE_RE = re.compile(r"\r|[^\S\n](?=\n|\Z)")
+
+
+def python_skeleton(source: str) -> str | None:
+    """Reduce Python source to imports, signatures and docstring summaries.
+
+    Function bodies are elided to ``...``; classes keep their attributes and
+    method signatures. Returns None if the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    lines = source.splitlines()
+    out: list[str] = []
+
+    def emit(node: ast.stmt, top_level: bool) -> None:
+        first = lines[node.lineno - 1]
+        indent = first[: len(first) - len(first.lstrip())]
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if top_level:
+                out.append(ast.unparse(node))
+            return
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            if node.end_lineno - node.lineno < 3:
+                out.extend(lines[node.lineno - 1 : node.end_lineno])
+            elif isinstance(node, ast.Assign):
+                targets = ", ".join(ast.unparse(t) for t in node.targets)
+                out.append(f"{indent}{targets} = ...")
+            else:
+                out.append(f"{indent}{ast.unparse(node.target)}: {ast.unparse(node.annotation)} = ...")
+            return
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            return
+        start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+        body_start = node.body[0].lineno
+        if body_start == node.lineno:  # one-liner — keep as is
+            out.extend(lines[start - 1 : node.end_lineno])
+            return
+        out.extend(lines[start - 1 : body_start - 1])
+        body_line = lines[body_start - 1]
+        pad = body_line[: len(body_line) - len(body_line.lstrip())]
+        doc = ast.get_docstring(node)
+        if doc:
+            out.append(f'{pad}"""{doc.splitlines()[0]}"""')
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                emit(child, False)
+        else:
+            out.append(f"{pad}...")
+
+    for node in tree.body:
+        emit(node, True)
+    return "\n".join(out)
+
+
+def canonical_text(text: str) -> str:
+    """LF line endings, no trailing whitespace on any line, no outer blank lines.
+
+    Prompt fields pass through this so formatting churn that means nothing
+    (CRLF vs LF, stray trailing spaces) can't change the tokens a model
+    server sees and break its prefix cache.
+    """
+    if not _WS_NOISE_RE.search(text):
+        return text.strip("\n")  # Already clean — no per-line rebuild
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip("\n")
+
+
+def _render_chat_file(path: str, content: str) -> tuple[str, str]:
+    """(header, body) of one file's block in the chat file listing."""
+    if len(content) <= MAX_CHAT_FILE_CHARS:
+        return f"### {path}\n```\n", content
+    skeleton = python_skeleton(content) if path.endswith(".py") else None
+    if skeleton:
+        return f"### {path} (skeleton — bodies elided)\n```\n", skeleton
+    return f"### {path}\n```\n", content[:MAX_CHAT_FILE_CHARS]
+
 
 class ContextManager:
     """
@@ -48,11 +131,17 @@ class ContextManager:
         self.state = state or ProjectState()
         self.planner_history: list[dict[str, str]] = []
         self.coder_history: list[dict[str, str]] = []
+        self.coder_session_file: str | None = None     # file the coder_history conversation is about
         self.reviewer_history: list[dict[str, str]] = []
         self.analyzer_history: list[dict[str, str]] = []
         self.chat_history: list[dict[str, str]] = []    # per-project chat
         self._task_dag: list[TaskNode] = []
         self.memory: ProjectMemory = ProjectMemory()
+        # Chat file listing: stable emission order + rendered block per path
+        self._chat_file_order: list[str] = []
+        self._chat_blocks: dict[str, tuple[str, str, str]] = {}
+        # Prompt sections derived from the plan: name -> (source object, text)
+        self._rendered: dict[str, tuple[object, str]] = {}
 
     # ── Plan & State ───────────────────────────────────────────────
 
@@ -130,11 +219,35 @@ class ContextManager:
     # ── Structured Memory Accessors ────────────────────────────────
 
     def get_architecture(self) -> str:
-        """Return the architecture summary for injection into prompts."""
-        return self.state.architecture_summary or "(no architecture defined)"
+        """Return the architecture summary for injection into prompts.
+
+        Canonicalized once per summary, so every role gets byte-identical
+        text however the plan was formatted.
+        """
+        return self._memo("architecture", self.state.architecture_summary, self._render_architecture)
+
+    def _render_architecture(self) -> str:
+        summary = canonical_text(self.state.architecture_summary or "")
+        return summary or "(no architecture defined)"
+
+    def _memo(self, key: str, source: object, build) -> str:
+        """Return build()'s text, reusing it while *source* is the same object.
+
+        set_plan() and session loads install new plan / file-index / summary
+        objects, so an identity check is enough to invalidate.
+        """
+        hit = self._rendered.get(key)
+        if hit is not None and hit[0] is source:
+            return hit[1]
+        text = build()
+        self._rendered[key] = (source, text)
+        return text
 
     def get_file_index_str(self) -> str:
         """Return formatted file index."""
+        return self._memo("file_index", self.state.file_index, self._render_file_index)
+
+    def _render_file_index(self) -> str:
         if not self.state.file_index:
             return "(empty)"
         lines = [f"- `{path}`: {purpose}" for path, purpose in self.state.file_index.items()]
@@ -144,8 +257,11 @@ class ContextManager:
         """Return the planner's spec contract details (schema, API, auth, deploy).
 
         These are injected into the coder prompt so the builder follows the
-        architectural spec exactly — no stack drift.
+        architectural spec exactly — no stack drift. Rendered once per plan.
         """
+        return self._memo("spec_details", self.state.plan, self._render_spec_details)
+
+    def _render_spec_details(self) -> str:
         plan = self.state.plan
         if not plan:
             return "(no spec)"
@@ -263,6 +379,19 @@ class ContextManager:
     def reset_channel(self, role_channel: str) -> None:
         getattr(self, f"{role_channel}_history").clear()
 
+    def replace_last_user(self, role_channel: str, system: str, content: str) -> None:
+        """Make a one-shot channel [system, user] without rebuilding it.
+
+        The system message is seeded once and kept while it is unchanged;
+        everything after it is replaced by the new user turn.
+        """
+        history = getattr(self, f"{role_channel}_history")
+        if not history or history[0]["role"] != "system" or history[0]["content"] != system:
+            history.clear()
+            history.append({"role": "system", "content": system})
+        del history[1:]
+        history.append({"role": "user", "content": content})
+
     # Legacy aliases
     def add_planner_message(self, role, content):
         self.add_message("planner", role, content)
@@ -274,6 +403,7 @@ class ContextManager:
         return self.get_messages("coder")
     def reset_coder_history(self):
         self.reset_channel("coder")
+        self.coder_session_file = None
 
     # ── Chat history (per-project conversation) ───────────────────
 
@@ -285,23 +415,136 @@ class ContextManager:
         """Return the full chat history for this project."""
         return list(self.chat_history)
 
-    def get_project_summary_for_chat(self) -> str:
+    def get_project_summary_for_chat(self, include_files: bool = True) -> str:
         """Build a context string describing the project for chat interactions."""
         parts = [
             f"Project: {self.state.name}",
             f"Description: {self.state.description}",
             f"Tech stack: {', '.join(self.state.tech_stack)}",
             f"Architecture: {self.state.architecture_summary or 'N/A'}",
-            "",
-            "Files:",
         ]
-        for path, purpose in (self.state.file_index or {}).items():
-            parts.append(f"  - {path}: {purpose}")
+        if include_files:
+            parts += ["", "Files:"]
+            for path, purpose in (self.state.file_index or {}).items():
+                parts.append(f"  - {path}: {purpose}")
 
         return "\n".join(parts)
 
     # ── File context (sliced, not dumped) ──────────────────────────
 
+    def get_chat_file_contents(self) -> str:
+        """Return every project file formatted for the chat prompt."""
+        return "".join(self.iter_chat_file_contents())
+
+    def iter_chat_file_contents(self) -> Iterator[str]:
+        """Yield the chat file listing as segments, without joining them.
+
+        Order is stable across turns: files keep the slot they were first
+        listed in (sorted on the first turn), and a file whose content
+        changed moves to the tail. Unchanged files therefore form a
+        byte-identical prefix that the model server's KV cache can reuse.
+        Each file's rendered block is memoized against its content, so
+        skeleton parsing only reruns for edited files.
+
+        Python files over MAX_CHAT_FILE_CHARS are sent as AST skeletons
+        instead of a truncated head. Bodies are yielded uncopied, so
+        splicing this into PromptTemplate.iter_render() builds the chat
+        prompt with a single join.
+        """
+        files = self.state.files
+        blocks = self._chat_blocks
+        for path in list(blocks):
+            if path not in files:
+                del blocks[path]
+
+        order = [p for p in self._chat_file_order if p in files]
+        changed: list[str] = []
+        for path in sorted(files):
+            content = files[path]
+            cached = blocks.get(path)
+            if cached is not None and cached[0] == content:
+                continue
+            blocks[path] = (content, *_render_chat_file(path, content))
+            if cached is not None:
+                order.remove(path)
+            changed.append(path)
+        order.extend(changed)
+        self._chat_file_order = order
+
+        separator = ""
+        for path in order:
+            _, header, body = blocks[path]
+            yield f"{separator}{header}"
+            yield body
+            yield "\n```"
+            separator = "\n\n"
+        if not separator:
+            yield "(no files yet)"
+
+    def get_referenced_file_contents(self, user_message: str) -> str:
+        """Full text of the shortened files the user mentions by path or name.
+
+        Goes in the per-turn tail of the chat prompt, after the stable file
+        listing. Returns "" when nothing needs expanding.
+        """
+        parts: list[str] = []
+        for path, content in sorted(self.state.files.items()):
+            if len(content) <= MAX_CHAT_FILE_CHARS:
+                continue  # Already whole in the listing
+            if path in user_message or Path(path).name in user_message:
+                parts.append(f"### {path}\n```\n{content[:MAX_FILE_READ_CHARS]}\n```")
+        if not parts:
+            return ""
+        return "\n## Referenced Files (full text)\n" + "\n\n".join(parts) + "\n"
+
+    def get_agentic_file_context(self, request: str) -> tuple[str, str]:
+        """File index and selected file contents for an agentic request.
+
+        The index lists every file (with its planned purpose, if any). Full
+        text goes in only up to AGENTIC_CONTEXT_MAX_CHARS: a project that
+        fits is sent whole; a larger one sends the files the request names,
+        then the closest matches from vector memory. Prompt size therefore
+        stays roughly constant however large the project grows.
+        """
+        files = self.state.files
+        if not files:
+            return "(no files yet)", "(no files yet)"
+
+        purposes = self.state.file_index or {}
+        index = "\n".join(
+            f"- {path}: {purposes[path]}" if path in purposes else f"- {path}"
+            for path in sorted(files)
+        )
+
+        if sum(len(c) for c in files.values()) <= AGENTIC_CONTEXT_MAX_CHARS:
+            selected = sorted(files)
+        else:
+            selected = [
+                p for p in sorted(files) if p in request or Path(p).name in request
+            ]
+            self.index_memory()
+            selected += [
+                p for p in self.memory.retrieve(
+                    request, top_k=AGENTIC_RETRIEVE_TOP_K, exclude=selected,
+                )
+                if p in files
+            ]
+
+        parts: list[str] = []
+        total = 0
+        for path in selected:
+            remaining = AGENTIC_CONTEXT_MAX_CHARS - total
+            if remaining <= 0:
+                break
+            body = files[path][:min(MAX_CHAT_FILE_CHARS, remaining)]
+            parts.append(f"### {path}\n```\n{body}\n```")
+            total += len(body)
+
+        omitted = len(files) - len(parts)
+        if omitted:
+            parts.append(f"({omitted} more file(s) in the index are not shown)")
+        return index, "\n\n".join(parts) if parts else "(no files yet)"
+
     def get_file_context(self, rel_paths: list[str]) -> str:
         """Return formatted contents of specific files — sliced, not all."""
         parts: list[str] = []
@@ -5,12 +5,12 @@ Architecture:
   1. Compute execution waves from the task DAG
   2. For each wave, run ALL tasks in parallel via WorkerPool
   3. Each task pipeline: GENERATE → REVIEW → VERIFY → FIX
-  4. Within a wave, generate all in parallel, review all in parallel
+  4. Within a wave, generate all in parallel, review in batched calls
   5. Fix only failures (sequentially per task, with escalation)
 
 Pipeline per wave:
   Phase A: Generate all files in the wave concurrently
-  Phase B: Review all generated files concurrently
+  Phase B: Review all generated files (batched), patch rejects concurrently
   Phase C: Verify all files (static analysis)
   Phase D: Fix only failures (multi-strategy, sequential)
 
@@ -33,8 +33,8 @@ from rich.prompt import Prompt
 
 from jcode.config import MAX_ITERATIONS, MAX_TASK_FAILURES, TaskStatus, get_model_for_role
 from jcode.context import ContextManager
-from jcode.coder import generate_file, patch_file
-from jcode.reviewer import review_file
+from jcode.coder import generate_file, generate_files, patch_file
+from jcode.reviewer import review_file, review_files
 from jcode.analyzer import analyze_error
 from jcode.planner import refine_plan
 from jcode.file_manager import ensure_project_dir, write_file, print_tree
@@ -136,7 +136,7 @@ def execute_plan(ctx: ContextManager, output_dir: Path) -> bool:
 
             # Phase A: Generate all files in parallel
             _log("PHASE A", f"Generating {len(ready)} file(s) in parallel")
-            _parallel_generate(ready, ctx, output_dir, pool)
+            _parallel_generate(ready, ctx, output_dir)
 
             # Phase B: Review (skip for simple projects — just verify)
             if not skip_review:
@@ -209,57 +209,45 @@ def _parallel_generate(
     wave: list,
     ctx: ContextManager,
     output_dir: Path,
-    pool: WorkerPool,
 ) -> None:
-    """Generate all files in the wave concurrently via WorkerPool."""
-
-    def _gen_worker(task_node) -> str:
-        """Worker function for a single file generation."""
-        task_dict = {
-            "id": task_node.id,
-            "file": task_node.file,
-            "description": task_node.description,
-            "depends_on": task_node.depends_on,
+    """Generate all files in the wave concurrently on one event loop."""
+    tasks = [
+        {
+            "id": node.id,
+            "file": node.file,
+            "description": node.description,
+            "depends_on": node.depends_on,
         }
-        task_node.status = TaskStatus.IN_PROGRESS
-        content = generate_file(task_dict, ctx, parallel=True)
-        write_file(output_dir, task_node.file, content)
-        task_node.status = TaskStatus.GENERATED
-        return content
+        for node in wave
+    ]
 
     if len(wave) == 1:
         # Single task — use streaming for better UX
         task_node = wave[0]
-        task_dict = {
-            "id": task_node.id,
-            "file": task_node.file,
-            "description": task_node.description,
-            "depends_on": task_node.depends_on,
-        }
         task_node.status = TaskStatus.IN_PROGRESS
         _log("GENERATE", task_node.file)
-        content = generate_file(task_dict, ctx, parallel=False)
+        content = generate_file(tasks[0], ctx, parallel=False)
         write_file(output_dir, task_node.file, content)
         task_node.status = TaskStatus.GENERATED
         return
 
-    # Multiple tasks — parallel silent generation
-    futures = []
+    # Multiple tasks — concurrent silent generation (asyncio.gather)
     for node in wave:
         _log("GENERATE", f"⚡ {node.file}")
-        future = pool.submit(_gen_worker, node, task_id=node.id)
-        futures.append(future)
+        node.status = TaskStatus.IN_PROGRESS
+    start = time.monotonic()
+    contents = generate_files(tasks, ctx)
+    elapsed_ms = int((time.monotonic() - start) * 1000)
 
-    results = pool.collect(futures)
-    for r in results:
-        if not r.success:
-            _log("GENERATE", f"  ⚠ Task {r.task_id} failed: {r.error[:100]}")
-        else:
-            _log("GENERATE", f"  ✓ Task {r.task_id} done ({r.duration_ms}ms)")
+    for node in wave:
+        write_file(output_dir, node.file, contents[node.file])
+        node.status = TaskStatus.GENERATED
+        _log("GENERATE", f"  ✓ Task {node.id} done")
+    _log("GENERATE", f"  Wave generated in {elapsed_ms}ms")
 
 
 # =====================================================================
-# Parallel Phase B: Review all generated files concurrently
+# Parallel Phase B: Review all generated files in batches
 # =====================================================================
 
 def _parallel_review(
@@ -268,13 +256,10 @@ def _parallel_review(
     output_dir: Path,
     pool: WorkerPool,
 ) -> None:
-    """Review all generated files in the wave concurrently."""
-
-    def _review_worker(task_node) -> dict:
-        """Worker function for reviewing a single file."""
-        task_node.status = TaskStatus.REVIEWING
-        review = review_file(task_node.file, ctx, parallel=True)
+    """Review all generated files in the wave, then patch the rejected ones concurrently."""
 
+    def _patch_worker(task_node, review: dict) -> dict:
+        """Worker function for patching a single reviewed file."""
         if review.get("approved", True):
             return review
 
@@ -310,11 +295,17 @@ def _parallel_review(
         _review_and_patch(task_node, ctx, output_dir)
         return
 
-    # Multiple files — parallel review
-    futures = []
+    # Multiple files — batched review (one call per REVIEW_BATCH_SIZE files),
+    # batches dispatched concurrently on the pool
     for node in wave:
         _log("REVIEW", f"⚡ {node.file}")
-        future = pool.submit(_review_worker, node, task_id=node.id)
+        node.status = TaskStatus.REVIEWING
+    reviews = review_files([node.file for node in wave], ctx, pool=pool)
+
+    # Patch rejected files in parallel
+    futures = []
+    for node in wave:
+        future = pool.submit(_patch_worker, node, reviews[node.file], task_id=node.id)
         futures.append(future)
 
     results = pool.collect(futures)
@@ -14,22 +14,38 @@ Key rules:
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import io
 import re
 import threading
+import time
+from collections.abc import Callable
 
+import httpx
 import ollama
 from rich.console import Console
 
 from jcode.config import (
-    PLANNER_MODEL, CODER_MODEL, REVIEWER_MODEL, ANALYZER_MODEL,
     PLANNER_OPTIONS, CODER_OPTIONS, REVIEWER_OPTIONS, ANALYZER_OPTIONS,
     REASONING_OPTIONS, AGENTIC_OPTIONS,
-    get_model_for_role, get_all_required_models, _is_model_local,
-    get_model_spec,
+    OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT, OLLAMA_WRITE_TIMEOUT,
+    OLLAMA_POOL_TIMEOUT, OLLAMA_KEEP_ALIVE, STRUCTURED_OUTPUT, MAX_WORKERS,
+    get_model_for_role, _is_model_local, get_model_spec,
 )
 
 console = Console()
 
+# One client per process — reuses its httpx connection pool across calls and
+# threads instead of going through the module-level helpers.
+_TIMEOUT = httpx.Timeout(
+    connect=OLLAMA_CONNECT_TIMEOUT,
+    read=OLLAMA_READ_TIMEOUT,
+    write=OLLAMA_WRITE_TIMEOUT,
+    pool=OLLAMA_POOL_TIMEOUT,
+)
+_client = ollama.Client(timeout=_TIMEOUT)
+
 # Cache of models we've already verified exist (thread-safe)
 _verified_models: set[str] = set()
 _verified_lock = threading.Lock()
@@ -37,6 +53,10 @@ _verified_lock = threading.Lock()
 # Lock for streaming output (only one stream at a time to console)
 _stream_lock = threading.Lock()
 
+# Short-lived cache of ollama.list() names — only changes when a model is pulled
+_LIST_TTL = 10.0
+_list_cache: tuple[float, list[str]] | None = None
+
 
 def _ensure_model(model: str) -> None:
     """Check that the model is available. NEVER pulls — warns and falls back."""
@@ -44,27 +64,31 @@ def _ensure_model(model: str) -> None:
         if model in _verified_models:
             return
 
-    try:
-        ollama.show(model)
+    # Membership check against the cached ollama.list() — no per-model RPC.
+    if _is_model_local(model):
         with _verified_lock:
             _verified_models.add(model)
         return
-    except ollama.ResponseError:
-        pass
 
     console.print(f"[yellow]⚠ Model {model} not installed. Using fallback.[/yellow]")
     with _verified_lock:
         _verified_models.add(model)
 
 
+# Name fragments of reasoning models missing from the registry
+_REASONING_KEYWORDS = ("deepseek-r1", "qwen3", "magistral", "phi4-reasoning", "glm-4")
+
+
+@functools.lru_cache(maxsize=64)
 def _is_reasoning_model(model: str) -> bool:
-    """Check if a model is a reasoning model (produces <think> blocks)."""
+    """Check if a model is a reasoning model (produces <think> blocks).
+    Memoized — the registry and keyword list are static."""
     spec = get_model_spec(model)
     if spec and spec.supports_thinking:
         return True
     # Heuristic fallback for models not in registry
     lower = model.lower()
-    return any(kw in lower for kw in ("deepseek-r1", "qwen3", "magistral", "phi4-reasoning", "glm-4"))
+    return any(kw in lower for kw in _REASONING_KEYWORDS)
 
 
 def _get_options_for_model(
@@ -86,14 +110,17 @@ def _get_options_for_model(
     # Override with model-category-specific settings
     if spec:
         if spec.category == "reasoning":
-            # Reasoning models need higher temp for exploration, bigger context
+            # Reasoning models need higher temp for exploration, bigger context,
+            # and room to think past a role's output cap
             options["temperature"] = max(options.get("temperature", 0.3), 0.35)
             options["num_ctx"] = max(options.get("num_ctx", 8192), REASONING_OPTIONS["num_ctx"])
+            options.pop("num_predict", None)
         elif spec.category == "agentic":
             options["num_ctx"] = max(options.get("num_ctx", 8192), AGENTIC_OPTIONS["num_ctx"])
     elif _is_reasoning_model(model):
         # Fallback for unregistered reasoning models
         options["num_ctx"] = max(options.get("num_ctx", 8192), 16384)
+        options.pop("num_predict", None)
 
     if num_ctx_override:
         options["num_ctx"] = num_ctx_override
@@ -171,7 +198,7 @@ def ensure_models_for_complexity(
     
     console.print(f"  [dim]Missing models: {', '.join(model_names)}[/dim]")
     console.print(f"  [dim]Estimated download: ~{size_estimate}GB (may take 10-30min per model)[/dim]")
-    console.print(f"  [dim]Tip: Press Ctrl+C during download to skip a model[/dim]")
+    console.print(f"  [dim]Tip: Press Ctrl+C during download to skip remaining models[/dim]")
     console.print()
     
     # Ask permission
@@ -184,16 +211,43 @@ def ensure_models_for_complexity(
     if should_pull:
         console.print()
         success_count = 0
-        for model_name, roles in missing:
+        if len(missing) == 1:
+            model_name, roles = missing[0]
             console.print(f"[bold]Pulling {model_name}[/bold] [dim](for {roles})[/dim]")
             if pull_model(model_name):
                 success_count += 1
             else:
                 console.print(f"[yellow]  Skipped — will use fallback for {roles}[/yellow]")
+        else:
+            # Overlap downloads — Ollama serializes GPU memory, not network I/O.
+            from concurrent.futures import ThreadPoolExecutor, as_completed
+
+            for model_name, roles in missing:
+                console.print(f"[bold]Pulling {model_name}[/bold] [dim](for {roles})[/dim]")
+
+            executor = ThreadPoolExecutor(max_workers=min(2, len(missing)))
+            futures = {
+                executor.submit(pull_model, model_name, False): (model_name, roles)
+                for model_name, roles in missing
+            }
+            try:
+                for fut in as_completed(futures):
+                    model_name, roles = futures[fut]
+                    if fut.result():
+                        success_count += 1
+                    else:
+                        console.print(f"[yellow]  Skipped {model_name} — will use fallback for {roles}[/yellow]")
+            except KeyboardInterrupt:
+                console.print("\n[yellow]⚠ Cancelling remaining pulls...[/yellow]")
+                for fut in futures:
+                    fut.cancel()
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
         
         if success_count > 0:
             console.print(f"\n[green]✓ Pulled {success_count}/{len(missing)} model(s)[/green]")
             refresh_local_models()
+            invalidate_model_list_cache()
         elif success_count == 0:
             console.print("\n[yellow]No models were pulled. Continuing with fallbacks.[/yellow]")
     else:
@@ -205,29 +259,80 @@ def ensure_models_for_complexity(
 def check_ollama_running() -> bool:
     """Return True if the Ollama server is reachable."""
     try:
-        ollama.list()
+        _client.list()
         return True
     except Exception:
         return False
 
 
 def list_available_models() -> list[str]:
-    """Return a list of model names available locally."""
+    """Return a list of model names available locally. Cached for _LIST_TTL seconds."""
+    global _list_cache
+    cached = _list_cache
+    if cached is not None and time.monotonic() - cached[0] < _LIST_TTL:
+        return list(cached[1])
     try:
-        response = ollama.list()
+        response = _client.list()
         models = response.get("models", []) if isinstance(response, dict) else []
         if not models and hasattr(response, "models"):
             models = response.models or []
-        return [
+        names = [
             (m.get("name", "") if isinstance(m, dict) else getattr(m, "model", ""))
             for m in models
         ]
     except Exception:
         return []
+    _list_cache = (time.monotonic(), names)
+    return list(names)
+
+
+def invalidate_model_list_cache() -> None:
+    """Drop the cached list_available_models() result (e.g. after a pull)."""
+    global _list_cache
+    _list_cache = None
 
 
 # ── Unified generation function ────────────────────────────────────
 
+_ROLE_OPTIONS = {
+    "planner": PLANNER_OPTIONS,
+    "coder": CODER_OPTIONS,
+    "reviewer": REVIEWER_OPTIONS,
+    "analyzer": ANALYZER_OPTIONS,
+    "chat": CODER_OPTIONS,       # Chat uses coder defaults
+}
+
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+
+def _is_retryable(err: Exception) -> bool:
+    """True for transient failures worth one retry (busy server, timeouts)."""
+    if isinstance(err, (httpx.TimeoutException, httpx.ConnectError)):
+        return True
+    err_str = str(err).lower()
+    return "busy" in err_str or "timeout" in err_str or "connection" in err_str
+
+
+def _resolve_model(
+    role: str,
+    num_ctx: int | None,
+    complexity: str,
+    size: str,
+    model_override: str | None,
+) -> tuple[str, dict]:
+    """Resolve the model for a role and build its model-aware options."""
+    if model_override:
+        model = model_override
+    else:
+        model = get_model_for_role(role, complexity, size)
+
+    base_options = _ROLE_OPTIONS.get(role, CODER_OPTIONS)
+
+    _ensure_model(model)
+
+    return model, _get_options_for_model(model, role, base_options, num_ctx)
+
+
 def call_model(
     role: str,
     messages: list[dict[str, str]],
@@ -236,6 +341,7 @@ def call_model(
     complexity: str = "medium",
     size: str = "medium",
     model_override: str | None = None,
+    format: dict | str | None = None,
 ) -> str:
     """
     Send messages to the best available model for role + classification.
@@ -248,47 +354,30 @@ def call_model(
         complexity: Task complexity for model routing.
         size: Task size for model routing.
         model_override: Force a specific model (bypasses routing).
+        format: JSON schema (or "json") for Ollama structured output.
+            Ignored when STRUCTURED_OUTPUT is disabled.
     """
-    # Resolve model
-    if model_override:
-        model = model_override
-    else:
-        model = get_model_for_role(role, complexity, size)
-
-    # Get role-specific base options
-    options_map = {
-        "planner": PLANNER_OPTIONS,
-        "coder": CODER_OPTIONS,
-        "reviewer": REVIEWER_OPTIONS,
-        "analyzer": ANALYZER_OPTIONS,
-        "chat": CODER_OPTIONS,       # Chat uses coder defaults
-    }
-    base_options = options_map.get(role, CODER_OPTIONS)
-
-    _ensure_model(model)
-
-    # Build final options (model-aware)
-    options = _get_options_for_model(model, role, base_options, num_ctx)
+    model, options = _resolve_model(role, num_ctx, complexity, size, model_override)
+    if not STRUCTURED_OUTPUT:
+        format = None
 
     try:
         if stream:
-            return _stream(model, messages, options)
+            return _stream(model, messages, options, format)
         else:
-            return _generate_silent(model, messages, options)
+            return _generate_silent(model, messages, options, format)
     except KeyboardInterrupt:
         console.print("\n[yellow]⚠ Interrupted[/yellow]")
         return ""
     except Exception as e:
-        err_str = str(e).lower()
-        if "busy" in err_str or "timeout" in err_str or "connection" in err_str:
+        if _is_retryable(e):
             console.print(f"\n[yellow]⚠ Ollama busy. Retrying in 3s...[/yellow]")
-            import time
             time.sleep(3)
             try:
                 if stream:
-                    return _stream(model, messages, options)
+                    return _stream(model, messages, options, format)
                 else:
-                    return _generate_silent(model, messages, options)
+                    return _generate_silent(model, messages, options, format)
             except Exception as retry_err:
                 console.print(f"\n[red]✗ Ollama error: {retry_err}[/red]")
                 console.print("[dim]  Is another JCode instance running?[/dim]")
@@ -303,90 +392,316 @@ def call_model_silent(
     complexity: str = "medium",
     size: str = "medium",
     model_override: str | None = None,
+    format: dict | str | None = None,
 ) -> str:
     """Thread-safe silent generation (no streaming). Used by parallel workers."""
     return call_model(
         role, messages, stream=False, num_ctx=num_ctx,
         complexity=complexity, size=size, model_override=model_override,
+        format=format,
     )
 
 
+def call_model_until(
+    role: str,
+    messages: list[dict[str, str]],
+    done: Callable[[str], bool],
+    num_ctx: int | None = None,
+    complexity: str = "medium",
+    size: str = "medium",
+    model_override: str | None = None,
+    format: dict | str | None = None,
+    prefix_chars: int = 64,
+) -> str:
+    """Silent generation that stops as soon as the caller has what it needs.
+
+    Streams without printing and calls ``done(head)`` on the visible
+    (think-stripped) text after each chunk, until the head reaches
+    *prefix_chars*. Once it returns True the stream is closed, which makes
+    Ollama stop decoding, and the partial text is returned. Past the
+    prefix, *done* is no longer called and the rest streams normally, so
+    it should decide on the opening of the reply. Thread-safe, like
+    call_model_silent.
+    """
+    model, options = _resolve_model(role, num_ctx, complexity, size, model_override)
+    if not STRUCTURED_OUTPUT:
+        format = None
+
+    def _once() -> str:
+        buf = io.StringIO()
+        think = _ThinkFilter()
+        head = ""
+        chunks = _client.chat(
+            model=model, messages=messages, options=options,
+            format=format, stream=True, keep_alive=OLLAMA_KEEP_ALIVE,
+        )
+        try:
+            for chunk in chunks:
+                visible = think.feed(chunk["message"]["content"])
+                if visible:
+                    buf.write(visible)
+                    if len(head) < prefix_chars:
+                        head += visible
+                        if done(head):
+                            break
+            else:
+                buf.write(think.flush())
+        finally:
+            chunks.close()  # Drops the HTTP stream — the server stops generating
+        return buf.getvalue().strip()
+
+    try:
+        return _once()
+    except Exception as e:
+        if _is_retryable(e):
+            console.print(f"\n[yellow]⚠ Ollama busy. Retrying in 3s...[/yellow]")
+            time.sleep(3)
+            try:
+                return _once()
+            except Exception as retry_err:
+                console.print(f"\n[red]✗ Ollama error: {retry_err}[/red]")
+                return ""
+        raise
+
+
+# ── Async generation (wave-based parallelism on one event loop) ────
+
+async def call_model_async(
+    role: str,
+    messages: list[dict[str, str]] | Callable[[], list[dict[str, str]]],
+    num_ctx: int | None = None,
+    complexity: str = "medium",
+    size: str = "medium",
+    model_override: str | None = None,
+    client: ollama.AsyncClient | None = None,
+    format: dict | str | None = None,
+) -> str:
+    """Silent (non-streaming) generation on an asyncio event loop.
+
+    Same routing and retry behaviour as call_model_silent, but I/O waits
+    yield to the loop instead of parking an OS thread. Pass a shared
+    AsyncClient to reuse one connection pool across a gather(); without
+    one, a client is opened and closed for this call.
+
+    *messages* may be a zero-argument callable that builds the list. It is
+    only invoked here, in a worker thread (prompt building may do blocking
+    work such as an embedding lookup), so the prompt is rendered just
+    before it is sent and dropped once the reply arrives.
+    """
+    if client is None:
+        async with ollama.AsyncClient(timeout=_TIMEOUT) as own:
+            return await call_model_async(
+                role, messages, num_ctx, complexity, size, model_override,
+                client=own, format=format,
+            )
+
+    model, options = _resolve_model(role, num_ctx, complexity, size, model_override)
+    if not STRUCTURED_OUTPUT:
+        format = None
+    if callable(messages):
+        messages = await asyncio.to_thread(messages)
+
+    async def _once() -> str:
+        resp = await client.chat(
+            model=model, messages=messages, options=options, format=format,
+            keep_alive=OLLAMA_KEEP_ALIVE,
+        )
+        return _THINK_RE.sub("", resp["message"]["content"]).strip()
+
+    try:
+        return await _once()
+    except Exception as e:
+        if _is_retryable(e):
+            console.print(f"\n[yellow]⚠ Ollama busy. Retrying in 3s...[/yellow]")
+            await asyncio.sleep(3)
+            try:
+                return await _once()
+            except Exception as retry_err:
+                console.print(f"\n[red]✗ Ollama error: {retry_err}[/red]")
+                return ""
+        raise
+
+
+def call_models_parallel(
+    requests: list[dict], max_concurrency: int = MAX_WORKERS,
+) -> list[str]:
+    """Run several silent generations concurrently and return texts in order.
+
+    Each request dict holds call_model_async keyword arguments
+    (``role``, ``messages`` and optionally ``num_ctx``, ``complexity``,
+    ``size``, ``model_override``, ``format``). All calls share one AsyncClient on a
+    single event loop, closed when the batch is done. A failed call is
+    reported and yields an empty string, as call_model_silent does after
+    its retry.
+
+    At most *max_concurrency* calls are in flight. Pass ``messages`` as a
+    callable and each prompt is built only when its call gets a slot and
+    released when it finishes, so peak prompt memory scales with the
+    concurrency, not the batch size.
+    """
+    async def _gather() -> list[str]:
+        slots = asyncio.Semaphore(max(1, max_concurrency))
+        async with ollama.AsyncClient(timeout=_TIMEOUT) as client:
+
+            async def _bounded(req: dict) -> str:
+                async with slots:
+                    return await call_model_async(**req, client=client)
+
+            results = await asyncio.gather(
+                *(_bounded(req) for req in requests),
+                return_exceptions=True,
+            )
+        texts: list[str] = []
+        for r in results:
+            if isinstance(r, BaseException):
+                console.print(f"\n[red]✗ Ollama error: {r}[/red]")
+                r = ""
+            texts.append(r)
+        return texts
+
+    return asyncio.run(_gather())
+
+
 # Legacy convenience wrappers (backward compat)
 
-def call_planner(messages, stream=True, num_ctx=None, complexity="medium", size="medium") -> str:
-    return call_model("planner", messages, stream, num_ctx, complexity, size)
+def call_planner(messages, stream=True, num_ctx=None, complexity="medium", size="medium", format=None) -> str:
+    return call_model("planner", messages, stream, num_ctx, complexity, size, format=format)
 
 def call_coder(messages, stream=True, num_ctx=None, complexity="medium", size="medium") -> str:
     return call_model("coder", messages, stream, num_ctx, complexity, size)
 
-def call_reviewer(messages, stream=True, num_ctx=None, complexity="medium", size="medium") -> str:
-    return call_model("reviewer", messages, stream, num_ctx, complexity, size)
+def call_reviewer(messages, stream=True, num_ctx=None, complexity="medium", size="medium", format=None) -> str:
+    return call_model("reviewer", messages, stream, num_ctx, complexity, size, format=format)
 
-def call_analyzer(messages, stream=True, num_ctx=None, complexity="medium", size="medium") -> str:
-    return call_model("analyzer", messages, stream, num_ctx, complexity, size)
+def call_analyzer(messages, stream=True, num_ctx=None, complexity="medium", size="medium", format=None) -> str:
+    return call_model("analyzer", messages, stream, num_ctx, complexity, size, format=format)
 
 
-def _generate_silent(model: str, messages: list[dict], options: dict) -> str:
+def _generate_silent(
+    model: str,
+    messages: list[dict],
+    options: dict,
+    format: dict | str | None = None,
+) -> str:
     """Non-streaming generation. Thread-safe."""
-    resp = ollama.chat(
+    resp = _client.chat(
         model=model,
         messages=messages,
         options=options,
+        format=format,
+        keep_alive=OLLAMA_KEEP_ALIVE,
     )
     text = resp["message"]["content"]
     # Strip <think> blocks from reasoning models
-    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
+    text = _THINK_RE.sub("", text).strip()
     return text
 
 
-def _stream(model: str, messages: list[dict], options: dict) -> str:
+class _ThinkFilter:
+    """Incremental <think>...</think> stripper for streamed tokens.
+
+    Tags may be split across chunks, so a possible partial tag at the end
+    of a chunk is carried over until the next one decides it.
+    """
+
+    _OPEN = "<think>"
+    _CLOSE = "</think>"
+
+    def __init__(self) -> None:
+        self.in_think = False
+        self._carry = ""
+
+    @staticmethod
+    def _partial_tail(data: str, tag: str) -> int:
+        """Length of the longest suffix of data that is a proper prefix of tag."""
+        for n in range(min(len(tag) - 1, len(data)), 0, -1):
+            if data.endswith(tag[:n]):
+                return n
+        return 0
+
+    def feed(self, token: str) -> str:
+        """Consume a token and return the visible text it releases."""
+        data = self._carry + token
+        self._carry = ""
+        out: list[str] = []
+        while data:
+            if self.in_think:
+                idx = data.find(self._CLOSE)
+                if idx < 0:
+                    keep = self._partial_tail(data, self._CLOSE)
+                    self._carry = data[len(data) - keep:] if keep else ""
+                    break
+                data = data[idx + len(self._CLOSE):]
+                self.in_think = False
+            else:
+                idx = data.find(self._OPEN)
+                if idx < 0:
+                    keep = self._partial_tail(data, self._OPEN)
+                    if keep:
+                        out.append(data[:-keep])
+                        self._carry = data[-keep:]
+                    else:
+                        out.append(data)
+                    break
+                out.append(data[:idx])
+                data = data[idx + len(self._OPEN):]
+                self.in_think = True
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Return any held-back text once the stream has ended."""
+        tail, self._carry = self._carry, ""
+        return "" if self.in_think else tail
+
+
+def _stream(
+    model: str,
+    messages: list[dict],
+    options: dict,
+    format: dict | str | None = None,
+) -> str:
     """Stream tokens to the console and return the full text.
-    Filters out <think>...</think> blocks from reasoning models.
+    Filters out <think>...</think> blocks (reasoning models) as they arrive,
+    writing only visible text to a single buffer — no post-hoc regex pass.
     Uses a lock so parallel streams don't interleave.
     Handles Ctrl+C gracefully — returns partial text instead of crashing."""
-    chunks: list[str] = []
-    in_think = False
-    is_reasoning = _is_reasoning_model(model)
+    buf = io.StringIO()
+    think = _ThinkFilter()
+    received = False
     interrupted = False
 
     with _stream_lock:
         try:
-            for chunk in ollama.chat(
+            for chunk in _client.chat(
                 model=model,
                 messages=messages,
                 options=options,
+                format=format,
                 stream=True,
+                keep_alive=OLLAMA_KEEP_ALIVE,
             ):
-                token = chunk["message"]["content"]
-                chunks.append(token)
-
-                # Filter <think> blocks from reasoning models
-                if is_reasoning:
-                    if "<think>" in token:
-                        in_think = True
-                        continue
-                    if "</think>" in token:
-                        in_think = False
-                        continue
-                    if in_think:
-                        continue
-
-                console.print(token, end="", highlight=False)
+                received = True
+                visible = think.feed(chunk["message"]["content"])
+                if visible:
+                    buf.write(visible)
+                    console.print(visible, end="", highlight=False)
         except KeyboardInterrupt:
             interrupted = True
             console.print("\n[yellow]⚠ Generation interrupted by user[/yellow]")
         except Exception:
-            if not chunks:
+            if not received:
                 raise
             # If we already have partial output, return it rather than crashing
             interrupted = True
             console.print("\n[yellow]⚠ Stream interrupted[/yellow]")
         finally:
+            tail = think.flush()
+            if tail:
+                buf.write(tail)
+                console.print(tail, end="", highlight=False)
             console.print()  # newline after stream
 
-    full_text = "".join(chunks)
-    # Also strip any complete <think> blocks from the final text
-    full_text = re.sub(r"<think>.*?</think>", "", full_text, flags=re.DOTALL).strip()
+    full_text = buf.getvalue().strip()
 
     if interrupted and full_text:
         console.print(f"[dim]  (partial output: {len(full_text)} chars)[/dim]")
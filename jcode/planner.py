@@ -13,38 +13,53 @@ from rich.console import Console
 from jcode.ollama_client import call_planner
 from jcode.prompts import PLANNER_SYSTEM, PLANNER_REFINE
 from jcode.context import ContextManager
+from jcode.schemas import PLANNER_FORMAT
+
+try:
+    import orjson
+    _json_loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:
+    _json_loads = json.loads
 
 console = Console()
 
+# Reasoning blocks and ```json fences around a reply, compiled once
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE_RE = re.compile(r"```(?:json)?\s*\n?(.*?)```", re.DOTALL)
+_DECODER = json.JSONDecoder()
+
 
 def _extract_json(text: str) -> dict:
     """
     Extract the first JSON object from model output.
     Handles markdown fences and DeepSeek-R1 think tags.
     """
+    # Fast path: structured output is already a bare JSON object
+    try:
+        obj = _json_loads(text)
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
+
     # Strip <think>...</think> blocks from DeepSeek-R1
-    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    text = _THINK_RE.sub("", text)
 
     # Try code fences
-    fence_match = re.search(r"```(?:json)?\s*\n?(.*?)```", text, re.DOTALL)
+    fence_match = _FENCE_RE.search(text)
     if fence_match:
         text = fence_match.group(1).strip()
 
-    # Find first { … } block
-    depth = 0
-    start = None
-    for i, ch in enumerate(text):
-        if ch == "{":
-            if depth == 0:
-                start = i
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0 and start is not None:
-                try:
-                    return json.loads(text[start : i + 1])
-                except json.JSONDecodeError:
-                    continue
+    # Decode an object at each '{' in turn; the first that parses wins
+    i = text.find("{")
+    while i != -1:
+        try:
+            obj, _ = _DECODER.raw_decode(text, i)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+        i = text.find("{", i + 1)
     raise ValueError("No valid JSON object found in model output.")
 
 
@@ -60,7 +75,10 @@ def create_plan(user_prompt: str, ctx: ContextManager) -> dict:
 
     complexity = ctx.get_complexity()
     size = ctx.get_size()
-    raw = call_planner(ctx.get_planner_messages(), stream=True, complexity=complexity, size=size)
+    raw = call_planner(
+        ctx.get_planner_messages(), stream=True,
+        complexity=complexity, size=size, format=PLANNER_FORMAT,
+    )
     ctx.add_planner_message("assistant", raw)
 
     plan = _extract_json(raw)
@@ -83,7 +101,7 @@ def refine_plan(ctx: ContextManager) -> dict:
     failure_log = ctx.get_failure_log_str()
     architecture = ctx.get_architecture()
 
-    prompt = PLANNER_REFINE.format(
+    prompt = PLANNER_REFINE.render(
         errors=errors_text,
         failure_log=failure_log,
         architecture=architecture,
@@ -95,7 +113,10 @@ def refine_plan(ctx: ContextManager) -> dict:
     planner_ctx, _ = ctx.get_context_sizes()
     complexity = ctx.get_complexity()
     size = ctx.get_size()
-    raw = call_planner(ctx.get_planner_messages(), stream=True, num_ctx=planner_ctx, complexity=complexity, size=size)
+    raw = call_planner(
+        ctx.get_planner_messages(), stream=True, num_ctx=planner_ctx,
+        complexity=complexity, size=size, format=PLANNER_FORMAT,
+    )
     ctx.add_planner_message("assistant", raw)
 
     plan = _extract_json(raw)
@@ -10,577 +10,279 @@ Prompt templates for all roles + modes:
 
 v0.9.0 — Multi-model prompts with classification-aware strategies.
 
-Role isolation is critical — each role only sees what it needs.
-"""
-
-# ═══════════════════════════════════════════════════════════════════
-#  PLANNER (reasoning model)
-# ═══════════════════════════════════════════════════════════════════
-
-PLANNER_SYSTEM = """\
-You are **JCode Planner**, an expert software architect.
-
-Your job:
-1. Deeply understand the user's request.
-2. Choose the optimal tech stack.
-3. Design a clear project structure with files and folders.
-4. Decompose implementation into a dependency-ordered task DAG.
-5. Write a brief architecture summary.
-6. Define database schema (if applicable).
-7. Define API surface (if applicable).
-8. Define auth flow (if applicable).
-9. Define deployment strategy (if applicable).
-
-RULES:
-- Respond with valid JSON only. No markdown fences around it.
-- Use this EXACT schema:
-
-{
-  "project_name": "string",
-  "description": "one-line summary",
-  "tech_stack": ["lang/framework", ...],
-  "architecture_summary": "2-3 sentence high-level description of how the system works",
-  "database_schema": {
-    "table_name": {
-      "columns": {"col_name": "type + constraints"},
-      "relationships": ["description of FK/references"]
-    }
-  },
-  "api_surface": [
-    {"method": "GET/POST/etc", "path": "/api/...", "description": "what it does"}
-  ],
-  "auth_flow": "description of authentication/authorization strategy, or 'none'",
-  "deployment": "Docker/Vercel/static/etc — how to run and deploy this",
-  "structure": {
-    "path/to/file.ext": "brief description of this file's purpose"
-  },
-  "tasks": [
-    {
-      "id": 1,
-      "file": "path/to/file.ext",
-      "description": "what to implement in this file",
-      "depends_on": []
-    }
-  ]
-}
-
-- "database_schema", "api_surface", "auth_flow", "deployment" may be empty/null \
-  for simple projects that don't need them. Include them when relevant.
-- Order tasks by dependency (independent first).
-- Each file should appear in exactly ONE task.
-- Include config files (package.json, requirements.txt, etc.).
-- Keep it practical — don't over-engineer.
-- depends_on uses task IDs (integers), not file names.
-- The spec is a CONTRACT — the builder must follow it exactly. No stack drift.
-
-ARCHITECTURE RULES (CRITICAL — follow strictly):
-- Use FREE, no-signup APIs when possible: open-meteo.com for weather, \
-  restcountries.com for countries, jsonplaceholder.typicode.com for test data, \
-  api.dictionaryapi.dev for definitions, wttr.in for weather.
-- NEVER create a config.json or .env file with API key placeholders for simple \
-  projects. If a free API exists, use it directly.
-- NEVER create separate config files for simple projects. Inline configuration.
-- For frontend-only projects (HTML/CSS/JS), put ALL JavaScript in a single file \
-  unless the project is complex.
-- MINIMIZE file count. A simple project should have 1-3 files max. Don't create \
-  unnecessary files.
-- Minimize dependencies between tasks. If files are independent, set depends_on=[].
-- For web apps: prefer a single index.html with inline CSS and JS for simple \
-  projects. Only split into separate files for medium+ complexity.
-- For complex projects: define CLEAR module boundaries. Each module should have \
-  a single responsibility. API routes in one place, database models in another, \
-  business logic separate from presentation.
-"""
-
-PLANNER_REFINE = """\
-The previous implementation produced errors. Here is the feedback:
-
-{errors}
-
-Previous failure log:
-{failure_log}
-
-Current architecture context:
-{architecture}
-
-Please output a REVISED JSON plan that fixes these issues.
-Same JSON schema as before. Focus on the broken parts only.
-"""
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  CODER (coding model — full file generation)
-# ═══════════════════════════════════════════════════════════════════
-
-CODER_SYSTEM = """\
-You are **JCode Coder**, an expert software developer.
-
-You will receive:
-- A project architecture summary (the SPEC — you must follow it exactly)
-- A file index showing every file and its purpose
-- Database schema, API surface, auth flow (if applicable)
-- A specific task describing what to implement
-- Relevant existing file contents
-
-RULES:
-- Output ONLY the complete file content. No explanations, no markdown fences.
-- Write clean, production-quality, well-commented code.
-- Follow the tech stack and conventions described in the spec.
-- Include all necessary imports.
-- If fixing an existing file, output the FULL corrected file.
-- You are a BUILDER — you implement EXACTLY what the planner specified.
-- NO STACK DRIFT: if the spec says React, don't use Vue. If it says PostgreSQL, \
-  don't use SQLite. Follow the spec as a contract.
-
-QUALITY RULES (CRITICAL):
-- Code MUST work out of the box. No placeholder API keys, no TODO stubs.
-- Use FREE APIs that require no signup: open-meteo.com, wttr.in, \
-  restcountries.com, jsonplaceholder.typicode.com, api.dictionaryapi.dev.
-- NEVER use localStorage to read config files. Use fetch() for JSON files \
-  or inline the configuration.
-- NEVER output placeholder values like 'YOUR_API_KEY_HERE' or empty strings \
-  for API endpoints.
-- All fetch calls MUST have error handling (try/catch or .catch).
-- All UI must show loading states and error states.
-- For HTML: include the title matching the project name, proper meta tags.
-- For CSS: use modern CSS (flexbox/grid), make it responsive, use a clean \
-  color scheme.
-- For JS: use async/await, handle all error cases, update DOM with real data.
-- Test the code mentally before outputting. Trace through it. Will it work?
-- If a database schema is defined, your SQL/ORM must match it exactly.
-- If an API surface is defined, your routes must match it exactly.
-"""
-
-CODER_TASK = """\
-## Architecture
-{architecture}
-
-## File Index
-{file_index}
+Ordering: every *_TASK template puts static text and session-stable fields
+(architecture, file index, project files) first and per-call fields
+(error, file content, user request) last, so consecutive calls share a
+byte-identical prefix and hit Ollama's / llama.cpp's KV prefix cache.
 
-## Spec Contract
-{spec_details}
+Storage: prompt text lives in jcode/prompt_templates/<name>.md (package
+data), not in this module. Each public constant is read from disk on
+first access and then cached as a module attribute, so prompts can be
+edited without touching code.
 
-## Current Task
-File: `{file_path}`
-Description: {task_description}
-
-{existing_context}
-
-Write the complete content for `{file_path}`. Output ONLY the raw file content.
-"""
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  CODER — PATCH MODE (function-level targeted fix)
-# ═══════════════════════════════════════════════════════════════════
-
-CODER_PATCH = """\
-## Architecture
-{architecture}
-
-## File to Patch
-`{file_path}`
-
-## Current Content
-```
-{file_content}
-```
-
-## Problem
-{error}
-
-## Reviewer Feedback
-{review_feedback}
-
-Apply a MINIMAL, TARGETED fix. Rules:
-1. Output the FULL corrected file.
-2. Only change what is necessary — do NOT rewrite unrelated code.
-3. Preserve all existing comments, formatting, and structure.
-4. If adding imports, add them in the correct location.
-
-Output ONLY the corrected file content, nothing else.
+Role isolation is critical — each role only sees what it needs.
 """
 
-
-# ═══════════════════════════════════════════════════════════════════
-#  REVIEWER (code critic — uses coding model with different prompt)
-# ═══════════════════════════════════════════════════════════════════
-
-REVIEWER_SYSTEM = """\
-You are **JCode Reviewer**, a strict senior code reviewer.
-
-Your job is to review generated code BEFORE it is executed.
-You catch bugs that compilers and linters miss:
-- Logic errors
-- Missing error handling
-- Security issues (hardcoded secrets, SQL injection, XSS)
-- Missing imports or undefined variables
-- API misuse or wrong function signatures
-- Race conditions, resource leaks
-- Incomplete implementations (TODO, placeholder, pass)
-
-RULES:
-- Be concise and specific.
-- Output valid JSON only:
-
-{
-  "approved": true/false,
-  "issues": [
-    {
-      "file": "path/to/file",
-      "line_hint": "approximate location or function name",
-      "severity": "critical|warning|suggestion",
-      "description": "what's wrong and how to fix it"
-    }
-  ],
-  "summary": "one-line overall assessment"
+import functools
+import json
+import re
+import sys
+import textwrap
+import warnings
+from collections.abc import Callable, Iterable, Iterator
+from importlib.resources import files
+from string import Formatter
+
+__all__ = [
+    "PromptTemplate", "prompt_digest", "prompt_tokens", "loaded_prompts",
+    "PLANNER_SYSTEM", "PLANNER_REFINE", "PLANNER_RESEARCH_CONTEXT",
+    "CODER_SYSTEM", "CODER_TASK", "CODER_PATCH", "CODER_PATCH_FOLLOWUP",
+    "REVIEWER_SYSTEM", "REVIEWER_TASK", "REVIEWER_TASK_BATCH",
+    "ANALYZER_SYSTEM", "ANALYZER_TASK",
+    "CHAT_SYSTEM", "CHAT_SYSTEM_IDENTITY", "CHAT_SYSTEM_MODES", "CHAT_CONTEXT",
+    "AGENTIC_SYSTEM", "AGENTIC_SYSTEM_IDENTITY", "AGENTIC_SYSTEM_PROTOCOL",
+    "AGENTIC_SYSTEM_RULES", "AGENTIC_TASK",
+    "GIT_COMMIT_MSG_SYSTEM",
+    "RESEARCH_SYSTEM", "RESEARCH_TASK",
+    "FILE_BLOCK_RE", "FILE_FENCED_RE", "FILE_MARKER_RE", "COMMAND_BLOCK_RE",
+]
+
+
+class PromptTemplate:
+    """A ``{field}`` prompt template, parsed once when first loaded.
+
+    The template is split into a parts list: literal segments plus an
+    empty slot for each placeholder. ``render()`` copies the list, fills
+    the slots by position and joins it. There is no format-grammar parse
+    and no per-segment branching on each call (~2x faster than
+    ``str.format``). Missing fields raise KeyError, exactly like
+    ``str.format``. Instances are callable as a shorthand for ``render()``.
+    """
+
+    __slots__ = ("source", "fields", "_parts", "_slots")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        parts: list[str] = []
+        slots: list[tuple[int, str]] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if spec or conversion:
+                raise ValueError(f"Unsupported format spec in prompt field {field!r}")
+            if literal:
+                parts.append(literal)
+            if field is not None:
+                # Interned: render(**kw) keys are interned identifiers, so
+                # the dict lookup hits on pointer identity
+                slots.append((len(parts), sys.intern(field)))
+                parts.append("")
+        self._parts = tuple(parts)
+        self._slots = tuple(slots)
+        self.fields = frozenset(f for _, f in slots)
+
+    def render(self, **values: object) -> str:
+        """Fill every placeholder and return the prompt text."""
+        parts = list(self._parts)
+        for index, field in self._slots:
+            parts[index] = str(values[field])
+        return "".join(parts)
+
+    # CODER_TASK(architecture=..., ...) — same fast path, call-site sugar
+    __call__ = render
+
+    def iter_render(self, **values: object) -> Iterator[str]:
+        """Yield the prompt as segments instead of one joined string.
+
+        A value may also be an iterable of strings (e.g. a generator over
+        file bodies); it is spliced in without being joined first, so the
+        caller's single ``"".join()`` is the only full copy made.
+        """
+        parts = self._parts
+        start = 0
+        for index, field in self._slots:
+            yield from parts[start:index]
+            value = values[field]
+            if isinstance(value, str):
+                yield value
+            elif isinstance(value, Iterable):
+                yield from value
+            else:
+                yield str(value)
+            start = index + 1
+        yield from parts[start:]
+
+    def __str__(self) -> str:
+        return self.source
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate(fields={sorted(self.fields)})"
+
+
+# Prompts with {field} placeholders — exported as PromptTemplate, not str
+_TEMPLATED = frozenset({
+    "PLANNER_REFINE",
+    "CODER_TASK",
+    "CODER_PATCH",
+    "CODER_PATCH_FOLLOWUP",
+    "REVIEWER_TASK",
+    "REVIEWER_TASK_BATCH",
+    "ANALYZER_TASK",
+    "CHAT_CONTEXT",
+    "AGENTIC_TASK",
+    "RESEARCH_TASK",
+    "PLANNER_RESEARCH_CONTEXT",
+})
+
+# Prompts assembled from segments (each its own resource file), joined by a
+# blank line. The segments are exported too: identity/rules text that never
+# changes stays separable from the more frequently edited mode/protocol specs.
+_COMPOSED: dict[str, tuple[str, ...]] = {
+    "CHAT_SYSTEM": ("CHAT_SYSTEM_IDENTITY", "CHAT_SYSTEM_MODES"),
+    "AGENTIC_SYSTEM": (
+        "AGENTIC_SYSTEM_IDENTITY", "AGENTIC_SYSTEM_PROTOCOL", "AGENTIC_SYSTEM_RULES",
+    ),
 }
 
-- Only mark approved=false for critical or warning issues.
-- Suggestions alone should still approve.
-- Be practical — don't flag style preferences as issues.
-"""
-
-REVIEWER_TASK = """\
-## Architecture
-{architecture}
-
-## File to Review
-`{file_path}` — {file_purpose}
 
-## File Content
-```
-{file_content}
-```
 
-## Related Files (for context)
-{related_context}
+def _schema_example(name: str) -> str:
+    """Compact JSON of a schemas.*_EXAMPLE dict.
 
-Review this file. Output JSON only.
-"""
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  ANALYZER (error parser — uses reasoning model)
-# ═══════════════════════════════════════════════════════════════════
-
-ANALYZER_SYSTEM = """\
-You are **JCode Analyzer**, an expert debugger.
+    Models read it as well as the indented form, and dropping the
+    indentation saves about 20% of the example's characters.
+    """
+    from jcode import schemas  # deferred — pulls in pydantic
+    return json.dumps(getattr(schemas, name), separators=(",", ":"), ensure_ascii=False)
 
-You receive raw error output (stack traces, lint errors, test failures).
-Your job is to produce a precise, actionable diagnosis.
 
-RULES:
-- Output valid JSON only:
-
-{
-  "root_cause": "one-line explanation of what went wrong",
-  "affected_file": "path/to/file.ext",
-  "affected_function": "function_name or null",
-  "fix_strategy": "specific instructions for the coder on how to fix this",
-  "is_dependency_issue": true/false,
-  "severity": "critical|warning|info"
+# Static prompts with {placeholders} that are filled once, at load, from
+# these fragment builders — not at render time.
+_FILLED = frozenset({"PLANNER_SYSTEM", "CODER_SYSTEM", "REVIEWER_SYSTEM", "ANALYZER_SYSTEM"})
+_FRAGMENTS: dict[str, Callable[[], str]] = {
+    # Shared by PLANNER_SYSTEM and CODER_SYSTEM — one wording, one file
+    "free_apis": lambda: _load("FRAGMENT_FREE_APIS").rstrip("\n"),
+    "planner_schema": lambda: _schema_example("PLANNER_EXAMPLE"),
+    "reviewer_schema": lambda: _schema_example("REVIEWER_EXAMPLE"),
+    "analyzer_schema": lambda: _schema_example("ANALYZER_EXAMPLE"),
 }
 
-- Be specific. Don't say "fix the error" — say exactly what to change.
-- If multiple files are affected, focus on the ROOT cause.
-- Distinguish between code bugs and missing dependencies.
-"""
-
-ANALYZER_TASK = """\
-## Project Architecture
-{architecture}
-
-## Error Output
-```
-{error_output}
-```
-
-## File That Caused the Error
-`{file_path}`
-
-## File Content
-```
-{file_content}
-```
-
-## Previous Fix Attempts (if any)
-{previous_fixes}
-
-Analyze this error. Output JSON only.
-"""
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  CHAT (project-aware conversation / modification agent)
-# ═══════════════════════════════════════════════════════════════════
-
-CHAT_SYSTEM = """\
-You are **JCode**, an expert software engineer embedded inside a coding project.
-You have FULL CONTEXT of ALL project files below. You can see every line of code.
-You are NOT a chatbot giving generic advice — you are an agent that reads the \
-actual code and makes precise, targeted fixes.
-
-CRITICAL RULES:
-- You already have ALL project files in context below. READ THEM.
-- NEVER say "I need more details" or "please provide the error". You have everything.
-- NEVER give generic checklists like "make sure MongoDB is running" or "try npm install".
-- When fixing errors, you MUST read the actual file contents provided, find the \
-  exact bug, and output the corrected file.
-- When an error message is provided, trace it through the actual code in context \
-  to find the root cause. The files are RIGHT THERE.
-
-**MODE 1 — ACTION (fix, change, add, create, refactor, debug):**
-Output the complete fixed/modified files using EXACTLY this format:
-
-===FILE: path/to/file.ext===
-(complete file content — every single line, raw code, NO markdown fences)
-===END===
-
-Rules:
-- MANDATORY: use ===FILE: ...=== / ===END=== for ANY file change.
-- MANDATORY: every ===FILE: block MUST end with ===END=== on its own line.
-- NEVER wrap file content in markdown code fences (``` or ```python etc).
-  Write raw code between ===FILE: and ===END=== markers.
-- Output the COMPLETE file — not diffs, not patches, not snippets.
-- The path must match the existing file path exactly as shown in the project.
-- For multiple files, output multiple ===FILE:=== ... ===END=== blocks.
-- You may include a 1-2 sentence explanation, but the file blocks are the priority.
-- If an error says "Cannot find module '../models/Todo'", look at the project \
-  files — if models/Todo.js is missing, CREATE it. If the path is wrong, FIX \
-  the require/import statement. Actually trace the error.
-
-**MODE 2 — DISCUSSION (questions, explanations, brainstorming):**
-Respond in plain conversational text referencing the ACTUAL code you can see. \
-No ===FILE:=== blocks. Be specific — quote function names, line references, \
-actual variable names from the code.
-
-**MODE 3 — RUN / DEPLOY:**
-When the user asks you to run something, install packages, or execute commands, \
-use ===RUN:=== blocks instead of showing them commands to copy-paste:
-
-===RUN: npm install===
-===RUN: npm start===
-
-For long-running processes (servers): ===BACKGROUND: npm start===
-One command per block. Files are applied before commands run.
-NEVER tell the user to run commands manually — emit ===RUN:=== blocks instead.
-
-**Mode detection:**
-- "fix the errors", "the app crashes", "add dark mode" -> ACTION (output files)
-- "how does auth work?", "explain the API" -> DISCUSSION
-- "how do I run this?", "deploy to vercel" -> RUN / DEPLOY
-
-**When you receive a RUNTIME ERROR:**
-1. Read the error message carefully — it tells you the exact file and line.
-2. Look at that file in the project files below.
-3. Trace the root cause (missing file? wrong import path? undefined variable?).
-4. Output the fixed file(s) using ===FILE:=== format.
-5. If a file is missing entirely, CREATE it with ===FILE:===.
-NEVER respond to a runtime error with "tips" or "suggestions". FIX IT.
-
-Be concise, precise, no fluff. You are a senior engineer shipping code.
-"""
-
-CHAT_CONTEXT = """\
-## Project Summary
-{project_summary}
-
-## All Project Files
-{file_contents}
+_PROMPT_NAMES = frozenset(n for n in __all__ if n.isupper() and not n.endswith("_RE"))
+_TEMPLATE_DIR = files(__package__).joinpath("prompt_templates")
 
-## Recent Conversation
-{chat_history}
 
-## User Message
-{user_message}
-
-Remember: If the user wants changes, you MUST use ===FILE: path=== ... ===END=== format. \
-If they just want to talk, respond in plain text. Decide based on their intent above.
-"""
+def _load(name: str) -> str:
+    """Read the prompt text for *name* (e.g. CODER_TASK → coder_task.md).
 
+    The text is normalized once here: CRLF line endings, common indentation,
+    and exactly one trailing newline. Leading blank lines are kept, because
+    PLANNER_RESEARCH_CONTEXT relies on one. Hand-edited files therefore can't
+    change the byte-identical prompt prefix, and no caller has to clean the
+    text again.
+    """
+    raw = _TEMPLATE_DIR.joinpath(f"{name.lower()}.md").read_text(encoding="utf-8")
+    text = textwrap.dedent(raw.replace("\r\n", "\n")).rstrip() + "\n"
+    return sys.intern(text)
 
-# ═══════════════════════════════════════════════════════════════════
-#  AGENTIC MODE — autonomous modification of existing projects
-# ═══════════════════════════════════════════════════════════════════
 
-AGENTIC_SYSTEM = """\
-You are **JCode**, an autonomous software engineer operating INSIDE a real project.
+def _source(name: str) -> str:
+    """Prompt text for *name* — its resource file, or its segments joined."""
+    segments = _COMPOSED.get(name)
+    if segments is not None:
+        module = sys.modules[__name__]
+        return sys.intern("\n".join(str(getattr(module, s)) for s in segments))
+    text = _load(name)
+    if name in _FILLED:
+        template = PromptTemplate(text)
+        text = sys.intern(template.render(**{f: _FRAGMENTS[f]() for f in template.fields}))
+    return text
 
-You have been given a REQUEST and the FULL codebase.
-Your job is to fulfill the request completely and autonomously — write files, \
-run commands, install packages, whatever is needed.
 
-═══════════════════════════════════════════════════════════════════
- FILE OUTPUT FORMAT — MANDATORY
-═══════════════════════════════════════════════════════════════════
+@functools.lru_cache(maxsize=None)
+def prompt_digest(name: str) -> str:
+    """BLAKE2b-128 hex digest of a prompt's text, computed once per name.
 
-You MUST output files in EXACTLY this format:
+    Cache layers key on this instead of re-hashing multi-KB system prompts
+    on every call.
+    """
+    import hashlib  # deferred — OpenSSL load is the bulk of this module's import time
 
-===FILE: path/to/file.ext===
-<complete file content here — raw code, NO markdown fences>
-===END===
+    if name not in _PROMPT_NAMES:
+        raise KeyError(name)
+    text = str(getattr(sys.modules[__name__], name))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
 
-CORRECT EXAMPLE:
-===FILE: main.py===
-import sys
 
-def main():
-    print("Hello!")
-
-if __name__ == "__main__":
-    main()
-===END===
-
-WRONG — DO NOT use markdown headings to label files:
-### FILE: main.py        ← WRONG — use ===FILE: main.py=== instead
-### main.py              ← WRONG
-#### FILE: main.py       ← WRONG
-
-WRONG — DO NOT wrap file content in fences:
-===FILE: main.py===
-```python           ← WRONG
-print("hello")
-```                 ← WRONG
-===END===
-
-CORRECT — raw code only between the markers:
-===FILE: main.py===
-print("hello")
-===END===
-
-ABSOLUTE RULES:
-1. Start every file block with ===FILE: path=== (no heading, no label before it).
-2. End every file block with ===END=== on its own line.
-3. Write raw code between the markers — NEVER use ```fences``` inside file blocks.
-4. Output COMPLETE file content — no diffs, no snippets, no "... rest unchanged".
-5. Path must match the existing file path exactly, or be a new path for new files.
-6. ===FILE: and ===END=== must each be alone on their line.
-
-═══════════════════════════════════════════════════════════════════
- COMMANDS
-═══════════════════════════════════════════════════════════════════
-
-===RUN: command===   — run a shell command (install, build, compile, migrate)
-===BACKGROUND: command===  — start a long-running process (server, watcher)
-
-Examples:
-===RUN: npm install express===
-===RUN: pip install flask===
-===RUN: npm run build===
-===BACKGROUND: npm start===
-
-RULES:
-- One command per block.
-- Files are applied BEFORE commands run.
-- NEVER emit ===RUN: python main.py=== or any interactive script.
-  Interactive programs are launched by the user separately.
-- ===RUN:=== is for: package installs, builds, compiles, migrations only.
-
-═══════════════════════════════════════════════════════════════════
- GENERAL RULES
-═══════════════════════════════════════════════════════════════════
-
-1. Read ALL project files in context before making changes.
-2. Only modify what is needed. Preserve code style and conventions.
-3. Fix Python scoping: do not shadow global constants with local variables of the same name.
-4. Write a brief 1-2 sentence summary BEFORE the ===FILE:=== blocks.
-
-You are shipping production code. Be precise. Be complete. Be autonomous.
-"""
+@functools.lru_cache(maxsize=None)
+def prompt_tokens(name: str) -> int:
+    """Estimated token count of a prompt's static text, computed once per name.
 
-AGENTIC_TASK = """\
-## Project
-{project_summary}
+    Local models each ship their own tokenizer, so this is the
+    PROMPT_CHARS_PER_TOKEN heuristic rather than an exact count — close
+    enough for budgeting and for sizing num_ctx without re-measuring.
+    """
+    from jcode.config import PROMPT_CHARS_PER_TOKEN
 
-## All Files
-{file_contents}
+    if name not in _PROMPT_NAMES:
+        raise KeyError(name)
+    text = str(getattr(sys.modules[__name__], name))
+    return -(-len(text) // PROMPT_CHARS_PER_TOKEN)
 
-## Request
-{user_request}
 
-## Git Status
-{git_status}
+def _check_budget(name: str) -> None:
+    """Warn once if a budgeted prompt has outgrown PROMPT_TOKEN_BUDGETS."""
+    from jcode.config import PROMPT_TOKEN_BUDGETS
 
-You are in AUTONOMOUS mode. Fulfill the request completely:
-- Create/modify files using ===FILE: path=== ... ===END=== format
-- Run commands using ===RUN: command=== format
-- Start servers using ===BACKGROUND: command=== format
-- Install dependencies BEFORE running the project
-Do NOT tell the user to run commands — YOU run them with ===RUN:=== blocks.
-"""
+    budget = PROMPT_TOKEN_BUDGETS.get(name)
+    if budget is None:
+        return
+    tokens = prompt_tokens(name)
+    if tokens > budget:
+        warnings.warn(
+            f"{name} is ~{tokens} tokens, over its {budget}-token budget",
+            stacklevel=3,
+        )
 
 
 # ═══════════════════════════════════════════════════════════════════
-#  GIT — commit message generation
+#  Response protocol
 # ═══════════════════════════════════════════════════════════════════
-
-GIT_COMMIT_MSG_SYSTEM = """\
-You are a git commit message generator. Given a diff or description of changes, \
-output a concise, conventional commit message. Format: type(scope): description
-
-Types: feat, fix, refactor, docs, style, test, chore, perf
-
-Rules:
-- Max 72 characters for the subject line
-- Be specific about what changed
-- Output ONLY the commit message, nothing else
-"""
+# The block formats CHAT_SYSTEM / AGENTIC_SYSTEM ask for, compiled once
+# and kept here next to the prompts that specify them.
+
+# ===FILE: path=== ... ===END===
+FILE_BLOCK_RE = re.compile(
+    r"===FILE:\s*(?P<path>.+?)\s*===[ \t]*\n(?P<body>.*?)===END===", re.DOTALL,
+)
+# ===FILE: path=== followed by a ``` block (model dropped ===END===)
+FILE_FENCED_RE = re.compile(
+    r"===FILE:\s*(?P<path>.+?)\s*===[ \t]*\n```\w*[ \t]*\n(?P<body>.*?)\n```", re.DOTALL,
+)
+# Bare ===FILE: path=== header line (raw-content fallback)
+FILE_MARKER_RE = re.compile(r"===FILE:\s*(?P<path>.+?)\s*===[ \t]*\n")
+# ===RUN: cmd=== / ===BACKGROUND: cmd===
+COMMAND_BLOCK_RE = re.compile(
+    r"===(?P<kind>RUN|BACKGROUND):\s*(?P<cmd>.+?)\s*===", re.IGNORECASE,
+)
 
 
 # ═══════════════════════════════════════════════════════════════════
-#  RESEARCH — web research summarization for heavy tasks
+#  Lazy attribute access (PEP 562)
 # ═══════════════════════════════════════════════════════════════════
 
-RESEARCH_SYSTEM = """\
-You are **JCode Researcher**, an expert technical analyst.
-
-You have been given web search results and documentation excerpts
-related to a coding task. Your job is to extract the most useful
-technical information for the implementation.
-
-Output a concise technical brief covering:
-1. Best practices and recommended approaches
-2. Key API endpoints, function signatures, or configuration patterns
-3. Common pitfalls and how to avoid them
-4. Required dependencies and their versions
-5. Code patterns or examples that are directly relevant
-
-RULES:
-- Be concise and actionable — this brief feeds directly into planning.
-- Focus on IMPLEMENTATION details, not general concepts.
-- If the search results are irrelevant, say so and suggest what to search for.
-- Output plain text, not JSON.
-- Max 500 words.
-"""
+def __getattr__(name: str) -> str | PromptTemplate:
+    if name not in _PROMPT_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    source = _source(name)
+    value = PromptTemplate(source) if name in _TEMPLATED else source
+    globals()[name] = value  # memoize — later lookups bypass __getattr__
+    _check_budget(name)
+    return value
 
-RESEARCH_TASK = """\
-## Task Description
-{task_description}
 
-## Technologies Involved
-{technologies}
+def loaded_prompts() -> list[str]:
+    """Names of the prompts this process has materialized so far."""
+    module_globals = globals()
+    return sorted(n for n in _PROMPT_NAMES if n in module_globals)
 
-## Search Results
-{search_results}
-
-Summarize the most relevant technical information for implementing this task.
-"""
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  PLANNER — enhanced for heavy tasks (with research context)
-# ═══════════════════════════════════════════════════════════════════
-
-PLANNER_RESEARCH_CONTEXT = """\
-
-## Research Brief
-The following technical research was conducted for this task:
-
-{research_brief}
-
-Use this information to make better architectural decisions. Prefer the
-approaches, APIs, and patterns described in the research.
-"""
 
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
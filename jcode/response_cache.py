@@ -0,0 +1,132 @@
+"""
+Exact-match response cache for the reviewer and analyzer.
+
+A coder retry often regenerates a byte-identical file, and the reviewer or
+analyzer is then asked the same question again. Replies are keyed by a
+BLAKE2b digest of (role, model, system prompt digest, task prompt). The
+task prompt embeds the architecture, so keys partition per project on their
+own.
+
+Hot entries live in an in-process LRU. Every entry is also written to a
+SQLite table in ~/.jcode (WAL mode), so a later session can reuse verdicts.
+The cache is best-effort: if the database can't be opened it runs
+memory-only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from jcode.config import (
+    RESPONSE_CACHE,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_DB,
+    RESPONSE_CACHE_MAX_AGE,
+)
+
+_lock = threading.Lock()
+_memory: OrderedDict[bytes, str] = OrderedDict()
+_db: sqlite3.Connection | None = None
+_db_failed = False
+
+
+def cache_key(*parts: str) -> bytes:
+    """Digest the prompt parts into a cache key (order-sensitive)."""
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.digest()
+
+
+def _connect() -> sqlite3.Connection | None:
+    """Open the on-disk table once. Caller holds _lock."""
+    global _db, _db_failed
+    if _db is not None or _db_failed:
+        return _db
+    try:
+        RESPONSE_CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(RESPONSE_CACHE_DB, timeout=5.0, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        with db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS prompt_cache "
+                "(hash BLOB PRIMARY KEY, response TEXT NOT NULL, ts REAL NOT NULL)"
+            )
+            db.execute(
+                "DELETE FROM prompt_cache WHERE ts < ?",
+                (time.time() - RESPONSE_CACHE_MAX_AGE,),
+            )
+        _db = db
+    except (OSError, sqlite3.Error):
+        _db_failed = True
+    return _db
+
+
+def _remember(key: bytes, response: str) -> None:
+    """Insert into the in-memory LRU. Caller holds _lock."""
+    _memory[key] = response
+    _memory.move_to_end(key)
+    if len(_memory) > RESPONSE_CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+def get(key: bytes) -> str | None:
+    """Return the cached response for *key*, or None on a miss."""
+    if not RESPONSE_CACHE:
+        return None
+    with _lock:
+        hit = _memory.get(key)
+        if hit is not None:
+            _memory.move_to_end(key)
+            return hit
+        db = _connect()
+        if db is None:
+            return None
+        try:
+            row = db.execute(
+                "SELECT response FROM prompt_cache WHERE hash = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        _remember(key, row[0])
+        return row[0]
+
+
+def put(key: bytes, response: str) -> None:
+    """Store *response* under *key* in memory and on disk."""
+    if not RESPONSE_CACHE or not response.strip():
+        return
+    with _lock:
+        _remember(key, response)
+        db = _connect()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO prompt_cache (hash, response, ts) VALUES (?, ?, ?)",
+                    (key, response, time.time()),
+                )
+        except sqlite3.Error:
+            pass
+
+
+def clear() -> None:
+    """Drop every cached response, in memory and on disk."""
+    with _lock:
+        _memory.clear()
+        db = _connect()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute("DELETE FROM prompt_cache")
+        except sqlite3.Error:
+            pass
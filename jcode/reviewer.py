@@ -9,42 +9,226 @@ JCode generates, reviews, THEN executes. Verification > intelligence.
 
 from __future__ import annotations
 
+import ast
+import configparser
 import json
 import re
+from pathlib import Path
 
 from rich.console import Console
 
-from jcode.ollama_client import call_reviewer, call_model_silent
-from jcode.prompts import REVIEWER_SYSTEM, REVIEWER_TASK
-from jcode.context import ContextManager
+from jcode import response_cache
+from jcode.config import (
+    get_model_for_role, REVIEW_BATCH_SIZE, REVIEW_BATCH_MAX_CHARS,
+    REVIEW_SKIP_DATA_CHARS, REVIEW_SKIP_PY_CHARS,
+)
+from jcode.ollama_client import call_model_until, call_model_silent
+from jcode.prompts import REVIEWER_SYSTEM, REVIEWER_TASK, REVIEWER_TASK_BATCH, prompt_digest
+from jcode.context import ContextManager, canonical_text
+from jcode.worker_pool import WorkerPool
+from jcode.schemas import REVIEWER_FORMAT, REVIEWER_BATCH_FORMAT
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
 
 console = Console()
 
+# Reasoning blocks and ```json fences around a reply, compiled once
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE_RE = re.compile(r"```(?:json)?\s*\n?(.*?)```", re.DOTALL)
+_DECODER = json.JSONDecoder()
+# A verdict that opens with "approved": true — nothing after it is acted on
+_APPROVED_RE = re.compile(r'\s*\{\s*"approved"\s*:\s*true\b')
+
+# Summary of the fallback verdict — such replies are never cached. Neither
+# are rejections: after a fix, a byte-identical file gets a fresh look.
+_UNPARSED_SUMMARY = "Could not parse review"
+
+# Max chars to include in review context
+MAX_REVIEW_CHARS = 10000
+_ELIDED = "\n... [middle of file elided] ...\n"
+
 
 def _extract_json(text: str) -> dict:
     """Extract JSON from reviewer output."""
-    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
-    fence = re.search(r"```(?:json)?\s*\n?(.*?)```", text, re.DOTALL)
+    # Fast path: structured output is already a bare JSON object
+    try:
+        obj = json.loads(text)
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
+
+    text = _THINK_RE.sub("", text)
+    fence = _FENCE_RE.search(text)
     if fence:
         text = fence.group(1).strip()
 
-    depth = 0
-    start = None
-    for i, ch in enumerate(text):
-        if ch == "{":
-            if depth == 0:
-                start = i
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0 and start is not None:
-                try:
-                    return json.loads(text[start : i + 1])
-                except json.JSONDecodeError:
-                    continue
+    # Decode an object at each '{' in turn; the first that parses wins
+    i = text.find("{")
+    while i != -1:
+        try:
+            obj, _ = _DECODER.raw_decode(text, i)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+        i = text.find("{", i + 1)
 
     # Fallback: if we can't parse, assume approval
-    return {"approved": True, "issues": [], "summary": "Could not parse review"}
+    return {"approved": True, "issues": [], "summary": _UNPARSED_SUMMARY}
+
+
+def _truncate(source: str, limit: int = MAX_REVIEW_CHARS) -> tuple[str, ...]:
+    """Keep the head (imports, signatures) and tail of an oversized file.
+
+    Both cuts fall on line boundaries, so the model never sees a dangling
+    half-line, and an edit to the elided middle leaves the prompt unchanged.
+    Returned as segments for PromptTemplate.iter_render(), so the pieces
+    are copied once, into the final prompt, rather than concatenated first.
+    """
+    if len(source) <= limit:
+        return (source,)
+    head_end = source.rfind("\n", 0, limit * 2 // 3) + 1
+    tail_start = source.find("\n", len(source) - (limit - head_end - len(_ELIDED))) + 1
+    if head_end <= 0 or tail_start <= head_end:
+        return (source[:limit],)
+    return (source[:head_end], _ELIDED, source[tail_start:])
+
+
+def _approved_early(text: str) -> bool:
+    return _APPROVED_RE.match(text) is not None
+
+
+def _complete_early_approval(raw: str) -> str:
+    """Turn a reply cut off after "approved": true into a whole verdict."""
+    if not _approved_early(raw):
+        return raw
+    try:
+        json.loads(raw)
+        return raw
+    except ValueError:
+        return json.dumps({"approved": True, "issues": [], "summary": "approved"})
+
+
+def _parses(content: str, suffix: str) -> bool:
+    """True if *content* is well-formed for its data format."""
+    try:
+        if suffix == ".json":
+            json.loads(content)
+        elif suffix == ".toml":
+            if tomllib is None:
+                return False
+            tomllib.loads(content)
+        elif suffix in (".yaml", ".yml"):
+            if yaml is None:
+                return False
+            yaml.safe_load(content)
+        elif suffix in (".ini", ".cfg"):
+            configparser.ConfigParser().read_string(content)
+        else:
+            # No parser for this format, so nothing vouches for it
+            return False
+        return True
+    except Exception:
+        return False
+
+
+_DATA_SUFFIXES = {".json", ".toml", ".yaml", ".yml", ".ini", ".cfg"}
+
+
+def _is_literal(node: ast.expr | None) -> bool:
+    """True if *node* is a constant or a container of constants."""
+    if node is None:  # Bare annotation: `x: int`
+        return True
+    try:
+        ast.literal_eval(node)
+        return True
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return False
+
+
+def _is_stub_node(node: ast.stmt) -> bool:
+    """Top-level statements that carry no logic worth a model's review."""
+    if isinstance(node, ast.Expr):  # Docstrings only — not bare calls
+        return isinstance(node.value, ast.Constant)
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return True
+    if isinstance(node, (ast.Assign, ast.AnnAssign)):
+        return _is_literal(node.value)
+    return False
+
+
+def _quick_verdict(file_path: str, content: str) -> dict | None:
+    """Approve trivial files without a model call; None means review it.
+
+    Small config/data files that parse, and small Python files made only
+    of imports, constants and docstrings (package __init__s, settings
+    stubs), have nothing a reviewer could flag beyond what parsing checks.
+    """
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+    if suffix in _DATA_SUFFIXES:
+        if len(content) > REVIEW_SKIP_DATA_CHARS or not _parses(content, suffix):
+            return None
+        kind = suffix.lstrip(".")
+    elif suffix == ".py":
+        if len(content) > REVIEW_SKIP_PY_CHARS:
+            return None
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            return None
+        if not all(_is_stub_node(node) for node in tree.body):
+            return None
+        kind = "python stub"
+    else:
+        return None
+    return {"approved": True, "issues": [], "summary": f"auto-approved ({kind}, {len(content)}B)"}
+
+
+def _empty_file_review(file_path: str) -> dict:
+    return {"approved": False, "issues": [{"file": file_path, "line_hint": "entire file", "severity": "critical", "description": "File is empty"}], "summary": "Empty file"}
+
+
+def _failed_review(file_path: str, error: Exception) -> dict:
+    """Verdict for a file whose review call raised: unapproved, nothing to patch."""
+    return {"approved": False, "issues": [], "summary": f"Review failed: {str(error)[:200]}"}
+
+
+def _review_file_guarded(file_path: str, ctx: ContextManager) -> dict:
+    """review_file() for batch fallbacks; a model error becomes a verdict."""
+    try:
+        return review_file(file_path, ctx, parallel=True)
+    except Exception as e:
+        console.print(f"  [dim]Review of {file_path} failed: {str(e)[:80]}[/dim]")
+        return _failed_review(file_path, e)
+
+
+def _related_context(file_path: str, ctx: ContextManager) -> str:
+    """Contents of up to 3 files this one depends on ("" for a leaf file)."""
+    related_paths = ctx.state.dependency_graph.get(file_path, [])
+    return ctx.get_file_context(related_paths[:3]) if related_paths else ""
+
+
+def _print_review(result: dict) -> None:
+    """Display a one-line verdict plus any issues."""
+    if result.get("approved"):
+        console.print(f"    [cyan]approved[/cyan] — {result.get('summary', '')}")
+    else:
+        issues = result.get("issues", [])
+        critical = [i for i in issues if i.get("severity") == "critical"]
+        warnings = [i for i in issues if i.get("severity") == "warning"]
+        console.print(f"    [dim]issues found[/dim] — {len(critical)} critical, {len(warnings)} warnings")
+        for issue in issues:
+            console.print(f"      [dim]-[/dim] {issue.get('description', '')}")
 
 
 def review_file(file_path: str, ctx: ContextManager, parallel: bool = False) -> dict:
@@ -67,62 +251,209 @@ def review_file(file_path: str, ctx: ContextManager, parallel: bool = False) ->
     file_purpose = ctx.state.file_index.get(file_path, "unknown purpose")
 
     if not file_content.strip():
-        return {"approved": False, "issues": [{"file": file_path, "line_hint": "entire file", "severity": "critical", "description": "File is empty"}], "summary": "Empty file"}
+        return _empty_file_review(file_path)
 
-    # Get related files for context
-    related_paths = []
-    deps = ctx.state.dependency_graph.get(file_path, [])
-    related_paths.extend(deps)
-    related_context = ctx.get_file_context(related_paths[:3]) if related_paths else "(none)"
+    quick = _quick_verdict(file_path, file_content)
+    if quick is not None:
+        console.print(f"  [dim]Reviewing[/dim] [cyan]{file_path}[/cyan] [dim](skipped)[/dim]")
+        _print_review(quick)
+        return quick
 
-    prompt = REVIEWER_TASK.format(
+    related = _related_context(file_path, ctx)
+    prompt = "".join(REVIEWER_TASK.iter_render(
         architecture=ctx.get_architecture(),
         file_path=file_path,
         file_purpose=file_purpose,
-        file_content=file_content[:MAX_REVIEW_CHARS],
-        related_context=related_context,
-    )
+        file_content=_truncate(canonical_text(file_content)),
+        related_files=f"## Related Files (for context)\n{related}\n\n" if related else "",
+    ))
 
     _, coder_ctx = ctx.get_context_sizes()
     complexity = ctx.get_complexity()
     size = ctx.get_size()
 
-    if parallel:
+    cache_key = response_cache.cache_key(
+        "reviewer", get_model_for_role("reviewer", complexity, size),
+        prompt_digest("REVIEWER_SYSTEM"), prompt,
+    )
+    raw = response_cache.get(cache_key)
+
+    if raw is not None:
+        console.print(f"  [dim]Reviewing[/dim] [cyan]{file_path}[/cyan] [dim](cached)[/dim]")
+    elif parallel:
         # Thread-safe silent mode — build messages locally
         messages = [
             {"role": "system", "content": REVIEWER_SYSTEM},
             {"role": "user", "content": prompt},
         ]
         console.print(f"  [dim]⚡ Reviewing[/dim] [cyan]{file_path}[/cyan]")
-        raw = call_model_silent("reviewer", messages, num_ctx=coder_ctx, complexity=complexity, size=size)
+        raw = call_model_until(
+            "reviewer", messages, _approved_early, num_ctx=coder_ctx,
+            complexity=complexity, size=size, format=REVIEWER_FORMAT,
+        )
     else:
-        ctx.reset_channel("reviewer")
-        ctx.add_message("reviewer", "system", REVIEWER_SYSTEM)
-        ctx.add_message("reviewer", "user", prompt)
+        ctx.replace_last_user("reviewer", REVIEWER_SYSTEM, prompt)
         console.print(f"  [dim]Reviewing[/dim] [cyan]{file_path}[/cyan]")
-        raw = call_reviewer(
+        raw = call_model_until(
+            "reviewer",
             ctx.get_messages("reviewer"),
-            stream=False,  # Reviews don't need streaming
+            _approved_early,  # Stop decoding once the verdict is an approval
             num_ctx=coder_ctx,
             complexity=complexity,
             size=size,
+            format=REVIEWER_FORMAT,
         )
+    raw = _complete_early_approval(raw)
 
     result = _extract_json(raw)
+    if result.get("approved") is True and result.get("summary") != _UNPARSED_SUMMARY:
+        response_cache.put(cache_key, raw)
 
-    # Display review summary
-    if result.get("approved"):
-        console.print(f"    [cyan]approved[/cyan] — {result.get('summary', '')}")
-    else:
-        issues = result.get("issues", [])
-        critical = [i for i in issues if i.get("severity") == "critical"]
-        warnings = [i for i in issues if i.get("severity") == "warning"]
-        console.print(f"    [dim]issues found[/dim] — {len(critical)} critical, {len(warnings)} warnings")
-        for issue in issues:
-            console.print(f"      [dim]-[/dim] {issue.get('description', '')}")
+    _print_review(result)
 
     return result
 
 
-# Max chars to include in review context
-MAX_REVIEW_CHARS = 10000
+def _file_section(file_path: str, ctx: ContextManager) -> str:
+    """One file's block in a batched review (the caller numbers it)."""
+    content = "".join(_truncate(canonical_text(ctx.state.files.get(file_path, ""))))
+    purpose = ctx.state.file_index.get(file_path, "unknown purpose")
+    related = _related_context(file_path, ctx)
+    section = f"`{file_path}` — {purpose}\n```\n{content}\n```\n"
+    return f"{section}Related files:\n{related}\n" if related else section
+
+
+def _review_batch(file_paths: list[str], sections: list[str], ctx: ContextManager) -> dict[str, dict]:
+    """One reviewer call for several files. Returns the reports it parsed, by file."""
+    prompt = REVIEWER_TASK_BATCH.render(
+        architecture=ctx.get_architecture(),
+        file_sections="\n".join(
+            f"### File {i}: {section}" for i, section in enumerate(sections, 1)
+        ),
+    )
+    _, coder_ctx = ctx.get_context_sizes()
+    complexity = ctx.get_complexity()
+    size = ctx.get_size()
+
+    cache_key = response_cache.cache_key(
+        "reviewer", get_model_for_role("reviewer", complexity, size),
+        prompt_digest("REVIEWER_SYSTEM"), prompt,
+    )
+    raw = response_cache.get(cache_key)
+    if raw is None:
+        messages = [
+            {"role": "system", "content": REVIEWER_SYSTEM},
+            {"role": "user", "content": prompt},
+        ]
+        raw = call_model_silent(
+            "reviewer", messages, num_ctx=coder_ctx,
+            complexity=complexity, size=size, format=REVIEWER_BATCH_FORMAT,
+        )
+
+    reports = _extract_json(raw).get("reports")
+    if not isinstance(reports, list):
+        return {}
+
+    wanted = set(file_paths)
+    by_file = {
+        r["file"]: r for r in reports
+        if isinstance(r, dict) and r.get("file") in wanted
+    }
+    if len(by_file) == len(wanted) and all(r.get("approved") is True for r in by_file.values()):
+        response_cache.put(cache_key, raw)
+    return by_file
+
+
+def _review_packed(file_paths: list[str], sections: list[str], ctx: ContextManager) -> dict[str, dict]:
+    """Review one packed batch; files the batched reply leaves out go alone.
+
+    Never raises: a failed batch call falls back to per-file reviews, and a
+    failed per-file review becomes an unapproved verdict, so one bad call
+    can't abort the wave.
+    """
+    if len(file_paths) == 1:
+        return {file_paths[0]: _review_file_guarded(file_paths[0], ctx)}
+
+    console.print(f"  [dim]⚡ Reviewing {len(file_paths)} files in one call[/dim]")
+    try:
+        reports = _review_batch(file_paths, sections, ctx)
+    except Exception as e:
+        console.print(f"  [dim]Batch review failed ({str(e)[:80]}); reviewing files one by one[/dim]")
+        reports = {}
+    results: dict[str, dict] = {}
+    for file_path in file_paths:
+        result = reports.get(file_path)
+        if result is None:
+            result = _review_file_guarded(file_path, ctx)
+        else:
+            console.print(f"  [dim]Reviewed[/dim] [cyan]{file_path}[/cyan]")
+            _print_review(result)
+        results[file_path] = result
+    return results
+
+
+def review_files(
+    file_paths: list[str],
+    ctx: ContextManager,
+    pool: WorkerPool | None = None,
+) -> dict[str, dict]:
+    """
+    Review several files with as few model calls as possible.
+
+    Files are packed into batched prompts of at most REVIEW_BATCH_SIZE files
+    and REVIEW_BATCH_MAX_CHARS characters. The system prompt is sent once per
+    batch, not once per file. Any file the batched reply leaves out is
+    reviewed alone with review_file().
+
+    With a pool, the batches run concurrently, so Ollama can decode them
+    side by side (up to its OLLAMA_NUM_PARALLEL) instead of one stream at
+    a time. Every call builds its own messages; no ctx channel is touched.
+    A model error never propagates: that file gets an unapproved verdict
+    whose summary carries the error.
+
+    Returns:
+        {file_path: review dict}, same shape as review_file()
+    """
+    results: dict[str, dict] = {}
+    batches: list[tuple[list[str], list[str]]] = []
+    paths: list[str] = []
+    sections: list[str] = []
+    used = 0
+
+    for file_path in file_paths:
+        content = ctx.state.files.get(file_path, "")
+        if not content.strip():
+            results[file_path] = _empty_file_review(file_path)
+            continue
+        quick = _quick_verdict(file_path, content)
+        if quick is not None:
+            results[file_path] = quick
+            continue
+        section = _file_section(file_path, ctx)
+        if paths and (len(paths) >= REVIEW_BATCH_SIZE or used + len(section) > REVIEW_BATCH_MAX_CHARS):
+            batches.append((paths, sections))
+            paths, sections, used = [], [], 0
+        paths.append(file_path)
+        sections.append(section)
+        used += len(section)
+    if paths:
+        batches.append((paths, sections))
+
+    if pool is None or len(batches) < 2:
+        for paths, sections in batches:
+            results.update(_review_packed(paths, sections, ctx))
+        return results
+
+    futures = [
+        pool.submit(_review_packed, paths, sections, ctx, task_id=i)
+        for i, (paths, sections) in enumerate(batches)
+    ]
+    for (paths, sections), r in zip(batches, pool.collect(futures)):
+        if r.success:
+            results.update(r.result)
+        else:
+            console.print(f"  [dim]Batch review failed ({r.error[:80]}); retrying in order[/dim]")
+            results.update(_review_packed(paths, sections, ctx))
+
+    return results
+
@@ -14,48 +14,137 @@ v0.7.0 — JCode lives inside your project.
 
 from __future__ import annotations
 
+import ast
+import gzip
+import hashlib
 import json
+import os
 import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from rich.console import Console
 
-from jcode.config import ProjectState
+from jcode.config import ProjectState, SCAN_CACHE, SCAN_CACHE_DIR, SCAN_CACHE_MAX_AGE
 from jcode.context import ContextManager
 
 console = Console()
 
-# Directories to always skip
-SKIP_DIRS = {
+# Directories to always skip (pruned during the walk, never descended into)
+SKIP_DIRS = frozenset({
     ".git", "node_modules", ".venv", "venv", "__pycache__",
     ".next", "dist", "build", ".mypy_cache", ".pytest_cache",
     ".tox", "egg-info", ".eggs", "coverage", ".nyc_output",
     ".turbo", ".cache", ".parcel-cache", "target", "vendor",
-}
+})
+# Suffix-named build dirs (e.g. mypkg.egg-info)
+SKIP_DIR_SUFFIXES = (".egg-info",)
 
 # File extensions we consider source code
-SOURCE_EXTENSIONS = {
+SOURCE_EXTENSIONS = frozenset({
     ".py", ".js", ".jsx", ".ts", ".tsx", ".html", ".css", ".scss",
     ".json", ".yaml", ".yml", ".toml", ".md", ".txt", ".sql",
     ".sh", ".bash", ".env", ".cfg", ".ini", ".xml", ".graphql",
     ".prisma", ".svelte", ".vue", ".go", ".rs", ".java", ".kt",
     ".rb", ".php", ".c", ".cpp", ".h", ".hpp", ".cs", ".swift",
     ".r", ".R", ".jl", ".lua", ".ex", ".exs", ".erl",
-}
+})
 
 # Max file size to read (skip binaries and huge files)
 MAX_FILE_SIZE = 100_000  # 100KB
 
+# Reads fan out over threads (file I/O releases the GIL) once a project
+# has enough files for the pool to pay for itself
+_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_PARALLEL_READ_MIN_FILES = 32
+
+# A NUL byte this early means a binary (or binary-ish) file behind a
+# source extension; it is skipped before the rest is read and decoded
+_BINARY_SNIFF_BYTES = 512
+
+_JS_SUFFIXES = frozenset({".js", ".jsx", ".ts", ".tsx"})
+
+# Purpose / import patterns, compiled once — they run per file and per line.
+# Purpose patterns only see the first _PURPOSE_HEAD_CHARS of a file, so a
+# docstring/comment may run off the end of that slice (\Z)
+_PURPOSE_HEAD_CHARS = 2048
+_PY_DOCSTRING_RE = re.compile(
+    r'^(?:#!/.*\n)?(?:#.*\n)*\s*(?:"""(.*?)(?:"""|\Z)|\'\'\'(.*?)(?:\'\'\'|\Z))', re.DOTALL,
+)
+_JS_COMMENT_RE = re.compile(r"\s*/\*\*?\s*(.*?)(?:\*/|\n|\Z)")
+# Line-scan fallback: "from X import" (group 1) or "import X" (group 2) at
+# the start of any line, found in one pass over the whole text
+_PY_IMPORT_LINE_RE = re.compile(
+    r"^[ \t]*(?:from[ \t]+(\.?\w[\w.]*)[ \t]+import|import[ \t]+(\w[\w.]*))",
+    re.MULTILINE,
+)
+# import ... from './module' or require('./module')
+_JS_IMPORT_RE = re.compile(r'''(?:import\s+.*?from\s+|require\s*\(\s*)['"](\.[^'"]+)['"]''')
+
 
 # ═══════════════════════════════════════════════════════════════════
 # Project type detection
 # ═══════════════════════════════════════════════════════════════════
 
-def detect_project_type(project_dir: Path) -> str:
+# Dependency name → tech-stack label (table order is report order)
+_KNOWN_PY_PACKAGES = {
+    "flask": "Flask", "django": "Django", "fastapi": "FastAPI",
+    "sqlalchemy": "SQLAlchemy", "pandas": "Pandas",
+    "numpy": "NumPy", "pytest": "pytest", "celery": "Celery",
+    "redis": "Redis", "psycopg2": "PostgreSQL",
+    "pymongo": "MongoDB", "requests": "Requests",
+    "beautifulsoup4": "BeautifulSoup", "scrapy": "Scrapy",
+}
+_KNOWN_NODE_PACKAGES = {
+    "react": "React", "next": "Next.js", "vue": "Vue",
+    "svelte": "Svelte", "angular": "Angular",
+    "express": "Express", "fastify": "Fastify",
+    "tailwindcss": "Tailwind CSS", "typescript": "TypeScript",
+    "prisma": "Prisma", "mongoose": "Mongoose",
+    "socket.io": "Socket.IO", "jest": "Jest",
+    "vitest": "Vitest", "vite": "Vite",
+    "three": "Three.js", "d3": "D3.js",
+}
+
+def _load_config_files(project_dir: Path) -> dict:
+    """
+    Read the manifests both detectors look at, once.
+
+    Returns {"package.json": merged dependencies + devDependencies or None,
+    "requirements.txt": text or None}; None when missing or unreadable.
+    """
+    configs: dict = {"package.json": None, "requirements.txt": None}
+
+    try:
+        data = json.loads((project_dir / "package.json").read_text())
+        configs["package.json"] = {
+            **data.get("dependencies", {}),
+            **data.get("devDependencies", {}),
+        }
+    except Exception:
+        pass
+
+    try:
+        configs["requirements.txt"] = (project_dir / "requirements.txt").read_text()
+    except Exception:
+        pass
+
+    return configs
+
+
+def detect_project_type(project_dir: Path, configs: dict | None = None) -> str:
     """
     Detect the primary project type from files present.
     Returns a human-readable label.
+
+    *configs* is _load_config_files() output, when the caller already has it.
     """
+    if configs is None:
+        configs = _load_config_files(project_dir)
+
     markers = {
         "package.json":     "Node.js",
         "next.config.js":   "Next.js",
@@ -85,98 +174,68 @@ def detect_project_type(project_dir: Path) -> str:
     for marker, ptype in markers.items():
         if (project_dir / marker).exists():
             # Refine Node.js detection
-            if ptype == "Node.js":
-                pkg = project_dir / "package.json"
-                try:
-                    data = json.loads(pkg.read_text())
-                    deps = {
-                        **data.get("dependencies", {}),
-                        **data.get("devDependencies", {}),
-                    }
-                    if "next" in deps:
-                        return "Next.js"
-                    if "react" in deps and "vite" in deps:
-                        return "React + Vite"
-                    if "react" in deps:
-                        return "React"
-                    if "vue" in deps:
-                        return "Vue"
-                    if "svelte" in deps:
-                        return "Svelte"
-                    if "express" in deps:
-                        return "Express.js"
-                    if "fastify" in deps:
-                        return "Fastify"
-                except Exception:
-                    pass
+            deps = configs["package.json"]
+            if ptype == "Node.js" and deps is not None:
+                if "next" in deps:
+                    return "Next.js"
+                if "react" in deps and "vite" in deps:
+                    return "React + Vite"
+                if "react" in deps:
+                    return "React"
+                if "vue" in deps:
+                    return "Vue"
+                if "svelte" in deps:
+                    return "Svelte"
+                if "express" in deps:
+                    return "Express.js"
+                if "fastify" in deps:
+                    return "Fastify"
             return ptype
 
     # Fallback: check for common file patterns
-    if list(project_dir.glob("*.py")):
+    if any(project_dir.glob("*.py")):
         return "Python"
-    if list(project_dir.glob("*.html")):
+    if any(project_dir.glob("*.html")):
         return "HTML/CSS"
-    if list(project_dir.glob("*.js")):
+    if any(project_dir.glob("*.js")):
         return "JavaScript"
 
     return "Unknown"
 
 
-def detect_tech_stack(project_dir: Path) -> list[str]:
+def detect_tech_stack(project_dir: Path, configs: dict | None = None) -> list[str]:
     """
     Detect the tech stack from project configuration files.
     Returns a list of technologies.
+
+    *configs* is _load_config_files() output, when the caller already has it.
     """
+    if configs is None:
+        configs = _load_config_files(project_dir)
     stack: list[str] = []
 
     # Python
-    req = project_dir / "requirements.txt"
-    if req.exists():
-        try:
-            content = req.read_text()
-            known = {
-                "flask": "Flask", "django": "Django", "fastapi": "FastAPI",
-                "sqlalchemy": "SQLAlchemy", "pandas": "Pandas",
-                "numpy": "NumPy", "pytest": "pytest", "celery": "Celery",
-                "redis": "Redis", "psycopg2": "PostgreSQL",
-                "pymongo": "MongoDB", "requests": "Requests",
-                "beautifulsoup4": "BeautifulSoup", "scrapy": "Scrapy",
-            }
-            for line in content.split("\n"):
-                pkg = line.strip().split("==")[0].split(">=")[0].split("<=")[0].lower()
-                if pkg in known:
-                    stack.append(known[pkg])
-        except Exception:
-            pass
+    content = configs["requirements.txt"]
+    if content is not None:
+        # Requirement names in file order
+        names = [
+            line.strip().split("==")[0].split(">=")[0].split("<=")[0].lower()
+            for line in content.split("\n")
+        ]
+        stack.extend(_KNOWN_PY_PACKAGES[n] for n in names if n in _KNOWN_PY_PACKAGES)
 
     pyproject = project_dir / "pyproject.toml"
     if pyproject.exists():
         stack.append("Python")
 
     # Node.js
-    pkg_json = project_dir / "package.json"
-    if pkg_json.exists():
-        try:
-            data = json.loads(pkg_json.read_text())
-            deps = {
-                **data.get("dependencies", {}),
-                **data.get("devDependencies", {}),
-            }
-            known_node = {
-                "react": "React", "next": "Next.js", "vue": "Vue",
-                "svelte": "Svelte", "angular": "Angular",
-                "express": "Express", "fastify": "Fastify",
-                "tailwindcss": "Tailwind CSS", "typescript": "TypeScript",
-                "prisma": "Prisma", "mongoose": "Mongoose",
-                "socket.io": "Socket.IO", "jest": "Jest",
-                "vitest": "Vitest", "vite": "Vite",
-                "three": "Three.js", "d3": "D3.js",
-            }
-            for dep, label in known_node.items():
-                if dep in deps:
-                    stack.append(label)
-        except Exception:
-            pass
+    deps = configs["package.json"]
+    if deps is not None:
+        # One C-level intersection; labels are then emitted in table order
+        matched = _KNOWN_NODE_PACKAGES.keys() & deps.keys()
+        stack.extend(
+            label for dep, label in _KNOWN_NODE_PACKAGES.items() if dep in matched
+        )
 
     # Docker
     if (project_dir / "Dockerfile").exists():
@@ -190,69 +249,137 @@ def detect_tech_stack(project_dir: Path) -> list[str]:
             stack.append("TypeScript")
 
     # Dedup while preserving order
-    seen = set()
-    deduped = []
-    for item in stack:
-        if item not in seen:
-            seen.add(item)
-            deduped.append(item)
-    return deduped
+    return list(dict.fromkeys(stack))
 
 
 # ═══════════════════════════════════════════════════════════════════
 # File scanning
 # ═══════════════════════════════════════════════════════════════════
 
+def walk_files(
+    root: str,
+    skip: frozenset[str] = SKIP_DIRS,
+    prefix: str = "",
+) -> Iterator[tuple[str, os.DirEntry]]:
+    """Yield (relative_path, entry) for every file under *root*.
+
+    Relative paths always use "/" separators, as the import extractors and
+    directory counts expect, on Windows too.
+
+    Entries named in *skip* (or ending in SKIP_DIR_SUFFIXES) are pruned
+    before descending, so ignored
+    trees cost one directory read, not a stat per file inside them.
+    Siblings are visited in name order with each directory expanded in
+    place, which matches sorted(Path.rglob("*")). Symlinked directories
+    are not followed (as rglob), symlinked files are.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:  # PermissionError, vanished directory, ...
+        return
+    for entry in entries:
+        if entry.name in skip or entry.name.endswith(SKIP_DIR_SUFFIXES):
+            continue
+        rel = f"{prefix}{entry.name}"
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_files(entry.path, skip, rel + "/")
+            elif entry.is_file():
+                yield rel, entry
+        except OSError:
+            continue
+
+
+def _read_source(candidate: tuple[str, str, int, int]) -> tuple[str, str | None]:
+    """(relative_path, text), or text None if unreadable or binary."""
+    rel_path, path = candidate[0], candidate[1]
+    try:
+        with open(path, "rb") as fh:
+            head = fh.read(_BINARY_SNIFF_BYTES)
+            if b"\0" in head:
+                return rel_path, None
+            text = (head + fh.read()).decode("utf-8", errors="replace")
+    except Exception:
+        return rel_path, None
+    # Same universal-newline translation a text-mode read would apply
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return rel_path, text
+
+
 def scan_files(project_dir: Path) -> dict[str, str]:
     """
     Scan all source files in the project directory.
     Returns a dict of {relative_path: content}.
     Skips binaries, huge files, and ignored directories.
     """
-    files: dict[str, str] = {}
+    return _read_sources(_source_candidates(project_dir))
+
 
+def _source_candidates(project_dir: Path) -> list[tuple[str, str, int, int]]:
+    """(relative_path, path, size, mtime_ns) for each file scan_files reads."""
+    candidates: list[tuple[str, str, int, int]] = []
     if not project_dir.exists():
-        return files
+        return candidates
 
-    for f in sorted(project_dir.rglob("*")):
-        if not f.is_file():
-            continue
+    for rel_path, entry in walk_files(str(project_dir)):
+        name = entry.name
 
         # Skip hidden files
-        if f.name.startswith(".") and f.name != ".env":
-            continue
-
-        # Skip ignored directories
-        try:
-            rel_parts = f.relative_to(project_dir).parts
-        except ValueError:
-            continue
-
-        if any(part in SKIP_DIRS for part in rel_parts):
+        if name.startswith(".") and name != ".env":
             continue
 
         # Skip non-source files
-        if f.suffix.lower() not in SOURCE_EXTENSIONS:
+        if os.path.splitext(name)[1].lower() not in SOURCE_EXTENSIONS:
             continue
 
-        # Skip huge files
+        # Skip huge files (one stat, cached on the entry)
         try:
-            if f.stat().st_size > MAX_FILE_SIZE:
-                continue
+            st = entry.stat()
         except OSError:
             continue
-
-        # Read file
-        try:
-            rel_path = str(f.relative_to(project_dir))
-            content = f.read_text(encoding="utf-8", errors="replace")
-            files[rel_path] = content
-        except Exception:
+        if st.st_size > MAX_FILE_SIZE:
             continue
 
+        candidates.append((rel_path, entry.path, st.st_size, st.st_mtime_ns))
+
+    return candidates
+
+
+def _read_sources(
+    candidates: list[tuple[str, str, int, int]],
+    dir_counts: Counter | None = None,
+) -> dict[str, str]:
+    """Read the candidates into {relative_path: content}, dropping failures.
+
+    If *dir_counts* is given, it also tallies the files kept per directory
+    ("(root)" for the top level).
+    """
+    files: dict[str, str] = {}
+    # Read files (map() keeps walk order, so the dict is the same either
+    # way); results are consumed as they arrive rather than listed first
+    if len(candidates) < _PARALLEL_READ_MIN_FILES:
+        _collect_sources(files, map(_read_source, candidates), dir_counts)
+    else:
+        with ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+            _collect_sources(files, pool.map(_read_source, candidates), dir_counts)
+
     return files
 
 
+def _collect_sources(
+    files: dict[str, str],
+    results: Iterator[tuple[str, str | None]],
+    dir_counts: Counter | None,
+) -> None:
+    for rel_path, content in results:
+        if content is not None:
+            files[rel_path] = content
+            if dir_counts is not None:
+                dir_counts[rel_path.rpartition("/")[0] or "(root)"] += 1
+
+
 def build_file_index(files: dict[str, str]) -> dict[str, str]:
     """
     Build a file index: {path: brief_description}.
@@ -268,8 +395,9 @@ def build_file_index(files: dict[str, str]) -> dict[str, str]:
 
 def _infer_file_purpose(path: str, content: str) -> str:
     """Infer a file's purpose from its name and content."""
-    name = Path(path).stem.lower()
-    suffix = Path(path).suffix.lower()
+    basename = os.path.basename(path)
+    name, suffix = os.path.splitext(basename)
+    name, suffix = name.lower(), suffix.lower()
 
     # Known config files
     config_files = {
@@ -287,14 +415,15 @@ def _infer_file_purpose(path: str, content: str) -> str:
         "docker-compose.yml": "Docker Compose services",
     }
 
-    basename = Path(path).name
     if basename in config_files:
         return config_files[basename]
 
+    # Docstrings and header comments sit at the top of the file
+    head = content[:_PURPOSE_HEAD_CHARS]
+
     # Try to extract docstring (Python)
     if suffix == ".py":
-        doc_match = re.match(r'^(?:#!/.*\n)?(?:#.*\n)*\s*(?:"""(.*?)"""|\'\'\'(.*?)\'\'\')',
-                             content, re.DOTALL)
+        doc_match = _PY_DOCSTRING_RE.match(head)
         if doc_match:
             doc = (doc_match.group(1) or doc_match.group(2) or "").strip()
             first_line = doc.split("\n")[0].strip()
@@ -302,8 +431,8 @@ def _infer_file_purpose(path: str, content: str) -> str:
                 return first_line[:100]
 
     # Try to extract first comment (JS/TS)
-    if suffix in (".js", ".jsx", ".ts", ".tsx"):
-        comment_match = re.match(r'\s*/\*\*?\s*(.*?)(?:\*/|\n)', content)
+    if suffix in _JS_SUFFIXES:
+        comment_match = _JS_COMMENT_RE.match(head)
         if comment_match:
             return comment_match.group(1).strip()[:100]
 
@@ -355,11 +484,11 @@ def build_dependency_graph(files: dict[str, str]) -> dict[str, list[str]]:
 
     for path, content in files.items():
         deps: list[str] = []
-        suffix = Path(path).suffix.lower()
+        suffix = os.path.splitext(path)[1].lower()
 
         if suffix == ".py":
             deps = _extract_python_imports(path, content, all_paths)
-        elif suffix in (".js", ".jsx", ".ts", ".tsx"):
+        elif suffix in _JS_SUFFIXES:
             deps = _extract_js_imports(path, content, all_paths)
 
         if deps:
@@ -368,35 +497,91 @@ def build_dependency_graph(files: dict[str, str]) -> dict[str, list[str]]:
     return graph
 
 
+def _iter_imports(body: list[ast.stmt]) -> Iterator[ast.Import | ast.ImportFrom]:
+    """Import statements in *body*, including nested blocks and defs.
+
+    Only statement lists are walked (no expressions), so this touches a
+    small fraction of the nodes ast.walk would.
+    """
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+            continue
+        for field in ("body", "orelse", "finalbody"):
+            block = getattr(node, field, None)
+            if block:
+                yield from _iter_imports(block)
+        for handler in getattr(node, "handlers", ()):
+            yield from _iter_imports(handler.body)
+
+
 def _extract_python_imports(path: str, content: str, all_paths: set[str]) -> list[str]:
-    """Extract local Python imports."""
+    """Extract local Python imports.
+
+    One ast.parse, then only statement nodes are visited, so multi-line
+    and multi-name imports resolve correctly at the cost of a C parse
+    rather than two regexes per line. Sources that don't parse
+    (mid-generation, other dialects) fall back to the line scan.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return _extract_python_imports_by_line(path, content, all_paths)
+
+    pkg = path.rpartition("/")[0]
     deps: list[str] = []
-    pkg_dir = str(Path(path).parent)
-
-    for line in content.split("\n"):
-        line = line.strip()
-        # from .module import ... or from package.module import ...
-        m = re.match(r"from\s+(\.?\w[\w.]*)\s+import", line)
-        if m:
-            module = m.group(1)
-            # Convert dotted path to file path
-            if module.startswith("."):
-                # Relative import
-                rel = module.lstrip(".").replace(".", "/")
-                candidate = f"{pkg_dir}/{rel}.py" if pkg_dir != "." else f"{rel}.py"
-            else:
-                candidate = module.replace(".", "/") + ".py"
 
-            if candidate in all_paths:
-                deps.append(candidate)
+    def add(candidate: str) -> None:
+        if candidate in all_paths and candidate not in deps:
+            deps.append(candidate)
+
+    for node in _iter_imports(tree.body):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                add(alias.name.replace(".", "/") + ".py")
+            continue
 
-        # import module
-        m = re.match(r"import\s+(\w[\w.]*)", line)
-        if m:
-            module = m.group(1)
+        if node.level:
+            # Relative import: each extra dot climbs one package
+            base_dir = pkg
+            for _ in range(node.level - 1):
+                base_dir = base_dir.rpartition("/")[0]
+            base = f"{base_dir}/" if base_dir else ""
+        else:
+            base = ""
+        module = (node.module or "").replace(".", "/")
+        if module:
+            add(f"{base}{module}.py")
+        # from pkg import submodule
+        prefix = f"{base}{module}/" if module else base
+        for alias in node.names:
+            add(f"{prefix}{alias.name}.py")
+
+    return deps
+
+
+def _extract_python_imports_by_line(path: str, content: str, all_paths: set[str]) -> list[str]:
+    """Line-scan fallback for sources ast can't parse."""
+    deps: list[str] = []
+    pkg_dir = path.rpartition("/")[0]
+
+    # The regex engine skips non-import lines without a Python-level
+    # split/strip per line; imports inside defs are still found
+    for m in _PY_IMPORT_LINE_RE.finditer(content):
+        module = m.group(1)
+        if module is None:
+            # import module
+            candidate = m.group(2).replace(".", "/") + ".py"
+        elif module.startswith("."):
+            # from .module import ... (relative)
+            rel = module.lstrip(".").replace(".", "/")
+            candidate = f"{pkg_dir}/{rel}.py" if pkg_dir else f"{rel}.py"
+        else:
+            # from package.module import ...
             candidate = module.replace(".", "/") + ".py"
-            if candidate in all_paths:
-                deps.append(candidate)
+
+        if candidate in all_paths:
+            deps.append(candidate)
 
     return deps
 
@@ -404,18 +589,17 @@ def _extract_python_imports(path: str, content: str, all_paths: set[str]) -> lis
 def _extract_js_imports(path: str, content: str, all_paths: set[str]) -> list[str]:
     """Extract local JS/TS imports."""
     deps: list[str] = []
-    file_dir = str(Path(path).parent)
+    file_dir = path.rpartition("/")[0]
 
-    # import ... from './module' or require('./module')
-    pattern = re.compile(r'''(?:import\s+.*?from\s+|require\s*\(\s*)['"](\.[^'"]+)['"]''')
-
-    for m in pattern.finditer(content):
-        rel_import = m.group(1)
+    for m in _JS_IMPORT_RE.finditer(content):
+        rel_import = m.group(1).lstrip("./")
         # Resolve relative path
-        if file_dir == ".":
-            candidate_base = rel_import.lstrip("./")
+        if not file_dir:
+            candidate_base = rel_import
+        elif rel_import:
+            candidate_base = f"{file_dir}/{rel_import}"
         else:
-            candidate_base = str(Path(file_dir) / rel_import.lstrip("./"))
+            candidate_base = file_dir
 
         # Try various extensions
         for ext in ("", ".js", ".jsx", ".ts", ".tsx", "/index.js", "/index.tsx", "/index.ts"):
@@ -427,6 +611,76 @@ def _extract_js_imports(path: str, content: str, all_paths: set[str]) -> list[st
     return deps
 
 
+# ═══════════════════════════════════════════════════════════════════
+# Scan cache
+# ═══════════════════════════════════════════════════════════════════
+
+_SCAN_CACHE_VERSION = "3"
+
+
+def _scan_cache_path(project_dir: Path) -> Path:
+    digest = hashlib.blake2b(
+        str(project_dir.resolve()).encode("utf-8"), digest_size=16,
+    ).hexdigest()
+    return SCAN_CACHE_DIR / f"{digest}.json.gz"
+
+
+def _scan_cache_key(candidates: list[tuple[str, str, int, int]]) -> str:
+    """Digest of every candidate's (path, size, mtime) — any edit, add or
+    delete changes it, committed or not."""
+    h = hashlib.blake2b(_SCAN_CACHE_VERSION.encode(), digest_size=20)
+    for rel_path, _, size, mtime_ns in candidates:
+        h.update(f"{rel_path}\0{size}\0{mtime_ns}\n".encode("utf-8", "surrogateescape"))
+    return h.hexdigest()
+
+
+def _load_scan_cache(path: Path, key: str) -> dict | None:
+    """Cached {file_index, dependency_graph}, or None on a miss."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, EOFError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != key:
+        return None
+    return data
+
+
+def _save_scan_cache(path: Path, key: str,
+                     file_index: dict[str, str],
+                     dep_graph: dict[str, list[str]]) -> None:
+    """Best-effort: a failed write just means the next launch rescans.
+
+    Only derived data is stored. File contents (.env included) never leave
+    the project; a cache hit re-reads them.
+    """
+    data = {
+        "key": key,
+        "file_index": file_index,
+        "dependency_graph": dep_graph,
+    }
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _prune_scan_cache(path.parent)
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=1) as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _prune_scan_cache(cache_dir: Path) -> None:
+    """Delete entries not rewritten within SCAN_CACHE_MAX_AGE."""
+    cutoff = time.time() - SCAN_CACHE_MAX_AGE
+    for entry in cache_dir.glob("*.json.gz"):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError:
+            pass
+
+
 # ═══════════════════════════════════════════════════════════════════
 # Full project scan → ContextManager
 # ═══════════════════════════════════════════════════════════════════
@@ -442,23 +696,39 @@ def scan_project(project_dir: Path) -> ContextManager:
     console.print(f"  [dim]Scanning project...[/dim]")
 
     # 1. Detect project type and tech stack
-    project_type = detect_project_type(project_dir)
-    tech_stack = detect_tech_stack(project_dir)
+    configs = _load_config_files(project_dir)
+    project_type = detect_project_type(project_dir, configs)
+    tech_stack = detect_tech_stack(project_dir, configs)
 
     console.print(f"  [cyan]Project type:[/cyan] {project_type}")
     if tech_stack:
         console.print(f"  [cyan]Tech stack:[/cyan] {', '.join(tech_stack)}")
 
-    # 2. Scan all source files
-    files = scan_files(project_dir)
-    file_count = len(files)
-    console.print(f"  [cyan]Files found:[/cyan] {file_count}")
+    # 2. Scan all source files — an unchanged tree (same paths, sizes and
+    #    mtimes) reuses the last index and graph
+    candidates = _source_candidates(project_dir)
+    cache_path = _scan_cache_path(project_dir)
+    cache_key = _scan_cache_key(candidates)
+    cached = _load_scan_cache(cache_path, cache_key) if SCAN_CACHE else None
 
-    # 3. Build file index
-    file_index = build_file_index(files)
+    dir_counts = Counter()
+    files = _read_sources(candidates, dir_counts)
 
-    # 4. Build dependency graph
-    dep_graph = build_dependency_graph(files)
+    if cached is not None:
+        file_index = cached["file_index"]
+        dep_graph = cached["dependency_graph"]
+    else:
+        # 3. Build file index
+        file_index = build_file_index(files)
+
+        # 4. Build dependency graph
+        dep_graph = build_dependency_graph(files)
+
+        if SCAN_CACHE:
+            _save_scan_cache(cache_path, cache_key, file_index, dep_graph)
+
+    file_count = len(files)
+    console.print(f"  [cyan]Files found:[/cyan] {file_count}")
 
     # 5. Create ProjectState
     state = ProjectState(
@@ -470,7 +740,7 @@ def scan_project(project_dir: Path) -> ContextManager:
         file_index=file_index,
         dependency_graph=dep_graph,
         architecture_summary=_build_architecture_summary(
-            project_dir.name, project_type, tech_stack, file_index,
+            project_dir.name, project_type, tech_stack, dir_counts,
         ),
     )
 
@@ -485,7 +755,7 @@ def _build_architecture_summary(
     name: str,
     project_type: str,
     tech_stack: list[str],
-    file_index: dict[str, str],
+    dir_counts: Counter,
 ) -> str:
     """Build a brief architecture summary from scanned data."""
     parts = [
@@ -495,17 +765,10 @@ def _build_architecture_summary(
         parts[0] += f" using {', '.join(tech_stack[:5])}"
     parts[0] += "."
 
-    # Count by directory
-    dirs: dict[str, int] = {}
-    for path in file_index:
-        d = str(Path(path).parent)
-        if d == ".":
-            d = "(root)"
-        dirs[d] = dirs.get(d, 0) + 1
-
-    if dirs:
+    # Largest directories (ties keep walk order)
+    if dir_counts:
         dir_summary = ", ".join(
-            f"{d} ({c} files)" for d, c in sorted(dirs.items(), key=lambda x: -x[1])[:5]
+            f"{d} ({c} files)" for d, c in dir_counts.most_common(5)
         )
         parts.append(f"Structure: {dir_summary}.")
 
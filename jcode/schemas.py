@@ -0,0 +1,149 @@
+"""
+Structured-output schemas for the JSON-speaking roles.
+
+Planner, reviewer and analyzer replies are JSON objects. Passing these
+schemas as Ollama's ``format=`` argument constrains decoding to valid
+JSON of the right shape, so the reply parses with a plain json.loads
+instead of fence/brace scanning. The prompt-embedded schema examples in
+prompts.py stay as grounding for the model (and as the fallback when
+STRUCTURED_OUTPUT is disabled).
+
+The *_EXAMPLE dicts are those prompt-embedded examples. prompts.py renders
+them with json.dumps, so prompt and models are edited side by side.
+"""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+# ── Planner ────────────────────────────────────────────────────────
+
+class PlanTable(BaseModel):
+    columns: dict[str, str] = {}
+    relationships: list[str] = []
+
+
+class PlanEndpoint(BaseModel):
+    method: str
+    path: str
+    description: str
+
+
+class PlanTask(BaseModel):
+    id: int
+    file: str
+    description: str
+    depends_on: list[int] = []
+
+
+class PlannerPlan(BaseModel):
+    project_name: str
+    description: str
+    tech_stack: list[str]
+    architecture_summary: str
+    database_schema: dict[str, PlanTable] | None = None
+    api_surface: list[PlanEndpoint] | None = None
+    auth_flow: str | None = None
+    deployment: str | None = None
+    structure: dict[str, str]
+    tasks: list[PlanTask]
+
+
+# ── Reviewer ───────────────────────────────────────────────────────
+
+class ReviewIssue(BaseModel):
+    file: str
+    line_hint: str
+    severity: Literal["critical", "warning", "suggestion"]
+    description: str
+
+
+class ReviewerReport(BaseModel):
+    approved: bool
+    issues: list[ReviewIssue]
+    summary: str
+
+
+class ReviewerFileReport(ReviewerReport):
+    file: str
+
+
+class ReviewerBatchReport(BaseModel):
+    reports: list[ReviewerFileReport]
+
+
+# ── Analyzer ───────────────────────────────────────────────────────
+
+class AnalyzerDiagnosis(BaseModel):
+    root_cause: str
+    affected_file: str
+    affected_function: str | None = None
+    fix_strategy: str
+    is_dependency_issue: bool
+    severity: Literal["critical", "warning", "info"]
+
+
+# ── Prompt examples ────────────────────────────────────────────────
+# Shape shown to the model in each role's system prompt; string values
+# describe the field.
+
+PLANNER_EXAMPLE: dict = {
+    "project_name": "string",
+    "description": "one-line summary",
+    "tech_stack": ["lang/framework"],
+    "architecture_summary": "2-3 sentence high-level description of how the system works",
+    "database_schema": {
+        "table_name": {
+            "columns": {"col_name": "type + constraints"},
+            "relationships": ["description of FK/references"],
+        },
+    },
+    "api_surface": [
+        {"method": "GET/POST/etc", "path": "/api/...", "description": "what it does"},
+    ],
+    "auth_flow": "description of authentication/authorization strategy, or 'none'",
+    "deployment": "Docker/Vercel/static/etc — how to run and deploy this",
+    "structure": {
+        "path/to/file.ext": "brief description of this file's purpose",
+    },
+    "tasks": [
+        {
+            "id": 1,
+            "file": "path/to/file.ext",
+            "description": "what to implement in this file",
+            "depends_on": [],
+        },
+    ],
+}
+
+REVIEWER_EXAMPLE: dict = {
+    "approved": True,
+    "issues": [
+        {
+            "file": "path/to/file",
+            "line_hint": "approximate location or function name",
+            "severity": "critical|warning|suggestion",
+            "description": "what's wrong and how to fix it",
+        },
+    ],
+    "summary": "one-line overall assessment",
+}
+
+ANALYZER_EXAMPLE: dict = {
+    "root_cause": "one-line explanation of what went wrong",
+    "affected_file": "path/to/file.ext",
+    "affected_function": "function_name or null",
+    "fix_strategy": "specific instructions for the coder on how to fix this",
+    "is_dependency_issue": False,
+    "severity": "critical|warning|info",
+}
+
+
+# JSON schemas handed to Ollama — computed once at import
+PLANNER_FORMAT: dict = PlannerPlan.model_json_schema()
+REVIEWER_FORMAT: dict = ReviewerReport.model_json_schema()
+REVIEWER_BATCH_FORMAT: dict = ReviewerBatchReport.model_json_schema()
+ANALYZER_FORMAT: dict = AnalyzerDiagnosis.model_json_schema()
@@ -8,9 +8,49 @@ v0.7.0 — Added git settings, CWD mode, agentic/chat mode preferences.
 from __future__ import annotations
 
 import json
+import os
+import string
 from pathlib import Path
 from dataclasses import dataclass, asdict
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+
+# ASCII characters allowed in project metadata filenames; the rest become "_"
+_SAFE_NAME_CHARS = frozenset(string.ascii_letters + string.digits + "._- ")
+_SAFE_NAME_TABLE = str.maketrans(
+    {chr(i): "_" for i in range(128) if chr(i) not in _SAFE_NAME_CHARS}
+)
+
+
+def _safe_name(name: str) -> str:
+    """Sanitize a project name into a metadata filename stem."""
+    if name.isascii():
+        safe = name.translate(_SAFE_NAME_TABLE)
+    else:
+        # Non-ASCII letters/digits are kept (str.isalnum is Unicode-aware)
+        safe = "".join(c if c.isalnum() or c in "._- " else "_" for c in name)
+    return safe.strip().replace(" ", "_").lower()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write via a sibling temp file + os.replace, so readers never see a
+    half-written file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
 
 @dataclass
 class UserSettings:
@@ -56,7 +96,7 @@ class SettingsManager:
         """Load settings from disk or create defaults."""
         if self.settings_file.exists():
             try:
-                data = json.loads(self.settings_file.read_text())
+                data = _json_loads(self.settings_file.read_bytes())
                 return UserSettings.from_dict(data)
             except Exception:
                 pass
@@ -65,9 +105,7 @@ class SettingsManager:
     def save_settings(self) -> None:
         """Persist settings to disk."""
         self.config_dir.mkdir(parents=True, exist_ok=True)
-        self.settings_file.write_text(
-            json.dumps(self.settings.to_dict(), indent=2)
-        )
+        _write_atomic(self.settings_file, _json_dumps(self.settings.to_dict()))
     
     def is_first_run(self) -> bool:
         """Check if this is the user's first time running JCode."""
@@ -93,7 +131,7 @@ class SettingsManager:
         if self.projects_dir.exists():
             for proj_file in self.projects_dir.glob("*.json"):
                 try:
-                    data = json.loads(proj_file.read_text())
+                    data = _json_loads(proj_file.read_bytes())
                     projects.append(data)
                 except Exception:
                     continue
@@ -105,30 +143,28 @@ class SettingsManager:
         
         # Use project name as filename (sanitized)
         name = project_data.get("name", "unnamed")
-        safe_name = "".join(c if c.isalnum() or c in "._- " else "_" for c in name)
-        safe_name = safe_name.strip().replace(" ", "_").lower()
+        safe_name = _safe_name(name)
         
         proj_file = self.projects_dir / f"{safe_name}.json"
-        proj_file.write_text(json.dumps(project_data, indent=2))
+        _write_atomic(proj_file, _json_dumps(project_data))
         
         self.settings.last_project = str(proj_file)
         self.save_settings()
     
     def load_project_metadata(self, project_name: str) -> dict | None:
         """Load project metadata by name."""
-        safe_name = "".join(c if c.isalnum() or c in "._- " else "_" for c in project_name)
-        safe_name = safe_name.strip().replace(" ", "_").lower()
+        safe_name = _safe_name(project_name)
         
         proj_file = self.projects_dir / f"{safe_name}.json"
         if proj_file.exists():
-            return json.loads(proj_file.read_text())
+            return _json_loads(proj_file.read_bytes())
         return None
     
     def get_last_project(self) -> dict | None:
         """Get the most recently worked on project."""
         if self.settings.last_project and Path(self.settings.last_project).exists():
             try:
-                return json.loads(Path(self.settings.last_project).read_text())
+                return _json_loads(Path(self.settings.last_project).read_bytes())
             except Exception:
                 pass
         return None
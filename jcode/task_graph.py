@@ -17,7 +17,7 @@ Within each wave, all tasks run concurrently via the WorkerPool.
 
 from __future__ import annotations
 
-from collections import defaultdict, deque
+from collections import Counter
 from dataclasses import dataclass, field
 from typing import Any, Callable
 
@@ -41,45 +41,57 @@ def compute_waves(dag: list[TaskNode]) -> list[list[TaskNode]]:
     if not dag:
         return []
 
-    # Build adjacency and in-degree
-    id_to_node = {t.id: t for t in dag}
-    in_degree: dict[int, int] = {t.id: 0 for t in dag}
-    dependents: dict[int, list[int]] = defaultdict(list)
+    # Work on positions 0..n-1 in parallel lists rather than id-keyed dicts
+    n = len(dag)
+    index = {t.id: i for i, t in enumerate(dag)}
+    edges = [
+        (index[dep], i)
+        for i, t in enumerate(dag)
+        for dep in t.depends_on
+        if dep in index
+    ]
 
-    for t in dag:
-        for dep in t.depends_on:
-            if dep in id_to_node:
-                in_degree[t.id] += 1
-                dependents[dep].append(t.id)
+    # In-degree plus CSR adjacency: the dependents of node i are
+    # children[offsets[i]:offsets[i + 1]], in DAG order
+    in_degree = [0] * n
+    offsets = [0] * (n + 1)
+    for parent, child in edges:
+        in_degree[child] += 1
+        offsets[parent + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    children = [0] * len(edges)
+    fill = offsets[:-1]
+    for parent, child in edges:
+        children[fill[parent]] = child
+        fill[parent] += 1
 
     # BFS topological sort in layers
-    waves: list[list[TaskNode]] = []
-    queue = deque([tid for tid, deg in in_degree.items() if deg == 0])
-
-    processed = 0
-    while queue:
-        wave_ids = list(queue)
-        queue.clear()
+    wave_indices: list[list[int]] = []
+    wave = [i for i in range(n) if in_degree[i] == 0]
 
-        wave_nodes = [id_to_node[tid] for tid in wave_ids]
-        waves.append(wave_nodes)
-        processed += len(wave_ids)
+    processed: set[int] = set()
+    while wave:
+        wave_indices.append(wave)
+        processed.update(wave)
 
-        for tid in wave_ids:
-            for child in dependents.get(tid, []):
+        next_wave: list[int] = []
+        for i in wave:
+            for child in children[offsets[i]:offsets[i + 1]]:
                 in_degree[child] -= 1
                 if in_degree[child] == 0:
-                    queue.append(child)
+                    next_wave.append(child)
+        wave = next_wave
 
-    if processed < len(dag):
+    if len(processed) < n:
         # Some nodes were never reached — cycle detected
-        unreached = [t for t in dag if t.id not in {n.id for w in waves for n in w}]
+        unreached = [t for i, t in enumerate(dag) if i not in processed]
         raise ValueError(
             f"Cycle detected in task DAG. Unreachable tasks: "
             f"{[t.id for t in unreached]}"
         )
 
-    return waves
+    return [[dag[i] for i in wave] for wave in wave_indices]
 
 
 def get_ready_wave(dag: list[TaskNode]) -> list[TaskNode]:
@@ -127,29 +139,28 @@ def execute_wave_parallel(
     return pool.collect(futures)
 
 
-def get_dag_stats(dag: list[TaskNode]) -> dict:
-    """Return statistics about the DAG execution state."""
+def get_dag_stats(dag: list[TaskNode], include_waves: bool = False) -> dict:
+    """
+    Return statistics about the DAG execution state.
+
+    The remaining wave count needs a topological sort of the unfinished
+    tasks, so it is only computed with include_waves=True (else 0).
+    """
+    counts = Counter(t.status for t in dag)
     stats = {
         "total": len(dag),
-        "pending": 0,
-        "in_progress": 0,
-        "verified": 0,
-        "failed": 0,
-        "skipped": 0,
+        "pending": counts[TaskStatus.PENDING],
+        "in_progress": (
+            counts[TaskStatus.IN_PROGRESS] + counts[TaskStatus.GENERATED]
+            + counts[TaskStatus.REVIEWING] + counts[TaskStatus.NEEDS_FIX]
+        ),
+        "verified": counts[TaskStatus.VERIFIED],
+        "failed": counts[TaskStatus.FAILED],
+        "skipped": counts[TaskStatus.SKIPPED],
         "waves": 0,
     }
-    for t in dag:
-        if t.status == TaskStatus.PENDING:
-            stats["pending"] += 1
-        elif t.status in (TaskStatus.IN_PROGRESS, TaskStatus.GENERATED,
-                          TaskStatus.REVIEWING, TaskStatus.NEEDS_FIX):
-            stats["in_progress"] += 1
-        elif t.status == TaskStatus.VERIFIED:
-            stats["verified"] += 1
-        elif t.status == TaskStatus.FAILED:
-            stats["failed"] += 1
-        elif t.status == TaskStatus.SKIPPED:
-            stats["skipped"] += 1
+    if not include_waves:
+        return stats
 
     try:
         pending_nodes = [t for t in dag if not t.is_terminal]
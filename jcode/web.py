@@ -18,15 +18,65 @@ v0.9.0 — Research pipeline for heavy tasks: multi-query search,
 from __future__ import annotations
 
 import re
+import functools
+import gzip
+import hashlib
 import json
+import os
+import threading
+import time
 import urllib.parse
-import urllib.request
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from html.parser import HTMLParser
+from pathlib import Path
 
+import httpx
 from rich.console import Console
 
+from jcode.config import (
+    WEB_CACHE,
+    WEB_CACHE_SIZE,
+    WEB_CACHE_DIR,
+    WEB_CACHE_TTL,
+    WEB_CACHE_DOCS_TTL,
+)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:
+    _json_loads = json.loads
+
 console = Console()
 
+# Concurrent requests per research step (searches, page reads)
+_FETCH_WORKERS = 8
+# Response bodies are cut here: callers keep at most ~15k chars of text, and
+# even script-heavy pages have reached their visible text well before this
+_MAX_FETCH_BYTES = 512_000
+
+# One client per process: keep-alive reuses TCP/TLS connections to a host
+# across searches, result pages and docs, and across research threads.
+# httpx asks for gzip/deflate and inflates the stream itself.
+_http = httpx.Client(
+    headers={
+        "User-Agent": "Mozilla/5.0 (compatible; JCode/0.4; +https://github.com/ShakenTheCoder/JcodeAgent)",
+        "Accept": "text/html,application/xhtml+xml,application/json,text/plain",
+    },
+    follow_redirects=True,
+    limits=httpx.Limits(
+        max_connections=2 * _FETCH_WORKERS,
+        max_keepalive_connections=_FETCH_WORKERS,
+    ),
+)
+
 # ── Global permission flag ─────────────────────────────────────────
 _internet_allowed: bool = False
 
@@ -44,10 +94,71 @@ def is_internet_allowed() -> bool:
 
 # ── Simple HTML text extractor ─────────────────────────────────────
 
+_SKIP_TAGS = frozenset({"script", "style", "noscript", "svg", "path", "meta", "link", "head"})
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_EMPTY_LINES_RE = re.compile(r"\n{2,}")
+
+# DuckDuckGo Lite result markup, for when selectolax isn't installed
+_DDG_LINK_RE = re.compile(
+    r'<a[^>]+class="result-link"[^>]*href="([^"]+)"[^>]*>(.*?)</a>',
+    re.DOTALL,
+)
+_DDG_SNIPPET_RE = re.compile(
+    r'<td[^>]+class="result-snippet"[^>]*>(.*?)</td>',
+    re.DOTALL,
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+# Body starts with a JSON object (leading whitespace allowed), tested in place
+_JSON_START_RE = re.compile(r"\s*\{")
+
+
+def _extract_text(html: str, max_chars: int | None = None) -> str:
+    """Visible text of an HTML page, one text chunk per line.
+
+    Uses selectolax's Lexbor parser (C tokenizer and tree) when installed,
+    else the stdlib html.parser-based _TextExtractor. With *max_chars*, the
+    Lexbor path stops walking the tree once a little more than that much
+    text is collected; callers still truncate the result.
+    """
+    if LexborHTMLParser is None:
+        extractor = _TextExtractor()
+        extractor.feed(html)
+        return extractor.get_text()
+
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(_SKIP_TAGS))
+    root = tree.body or tree.root
+    if root is None:
+        return ""
+    if max_chars is not None:
+        # Skip tags are already stripped, so every text node is visible.
+        # Headroom over max_chars mirrors what the full join would keep.
+        limit = max_chars * 1.25
+        parts: list[str] = []
+        total = 0
+        for node in root.traverse(include_text=True):
+            if node.tag != "-text":
+                continue
+            text = node.text_content
+            text = text.strip() if text else ""
+            if text:
+                parts.append(text)
+                total += len(text) + 1
+                if total >= limit:
+                    break
+        return "\n".join(parts)
+    # Whitespace-only text nodes come back as empty lines; html.parser's
+    # extractor dropped them, so do the same
+    raw = _EMPTY_LINES_RE.sub("\n", root.text(separator="\n", strip=True))
+    return raw.strip()
+
+
 class _TextExtractor(HTMLParser):
     """Strip HTML tags and extract visible text."""
 
-    _skip_tags = {"script", "style", "noscript", "svg", "path", "meta", "link", "head"}
+    # meta/link are void elements: they never get an end tag, so counting
+    # them would leave the rest of the page skipped
+    _skip_tags = _SKIP_TAGS - {"meta", "link"}
 
     def __init__(self):
         super().__init__()
@@ -55,11 +166,11 @@ class _TextExtractor(HTMLParser):
         self._skip_depth = 0
 
     def handle_starttag(self, tag, attrs):
-        if tag.lower() in self._skip_tags:
+        if tag in self._skip_tags:
             self._skip_depth += 1
 
     def handle_endtag(self, tag):
-        if tag.lower() in self._skip_tags:
+        if tag in self._skip_tags:
             self._skip_depth = max(0, self._skip_depth - 1)
 
     def handle_data(self, data):
@@ -71,26 +182,185 @@ class _TextExtractor(HTMLParser):
     def get_text(self) -> str:
         raw = "\n".join(self._parts)
         # Collapse multiple blank lines
-        raw = re.sub(r"\n{3,}", "\n\n", raw)
+        raw = _BLANK_LINES_RE.sub("\n\n", raw)
         return raw.strip()
 
 
-def _fetch_raw(url: str, timeout: int = 15) -> str:
-    """Fetch raw HTML from a URL using only stdlib."""
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "Mozilla/5.0 (compatible; JCode/0.4; +https://github.com/ShakenTheCoder/JcodeAgent)",
-            "Accept": "text/html,application/xhtml+xml,application/json,text/plain",
-        },
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        charset = resp.headers.get_content_charset() or "utf-8"
-        return resp.read().decode(charset, errors="replace")
+# ── Page cache ─────────────────────────────────────────────────────
+# url → (fetched_at, text). Best-effort: disk errors just mean a refetch.
+
+_cache_lock = threading.Lock()
+_page_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+_disk_pruned = False
+
+
+def _cache_ttl(url: str) -> float:
+    host = urllib.parse.urlsplit(url).hostname or ""
+    return WEB_CACHE_DOCS_TTL if host in _TECH_DOCS_HOSTS else WEB_CACHE_TTL
+
+
+def _cache_path(url: str) -> Path:
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=20).hexdigest()
+    return WEB_CACHE_DIR / f"{digest}.gz"
+
+
+def _cache_get(url: str) -> str | None:
+    """Cached text for *url* if fetched within its TTL, else None."""
+    ttl = _cache_ttl(url)
+    now = time.time()
+    with _cache_lock:
+        hit = _page_cache.get(url)
+        if hit is not None:
+            if now - hit[0] < ttl:
+                _page_cache.move_to_end(url)
+                return hit[1]
+            del _page_cache[url]
+
+    path = _cache_path(url)
+    try:
+        fetched_at = path.stat().st_mtime
+        if now - fetched_at >= ttl:
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            text = fh.read()
+    except (OSError, EOFError, ValueError):
+        return None
+    _cache_remember(url, fetched_at, text)
+    return text
+
+
+def _cache_remember(url: str, fetched_at: float, text: str) -> None:
+    with _cache_lock:
+        _page_cache[url] = (fetched_at, text)
+        _page_cache.move_to_end(url)
+        if len(_page_cache) > WEB_CACHE_SIZE:
+            _page_cache.popitem(last=False)
+
+
+def _prune_disk_cache() -> None:
+    """Delete files past the longest TTL (no URL can still use them), and
+    temp files left by interrupted writes. Runs once per process."""
+    global _disk_pruned
+    with _cache_lock:
+        if _disk_pruned:
+            return
+        _disk_pruned = True
+    cutoff = time.time() - max(WEB_CACHE_TTL, WEB_CACHE_DOCS_TTL)
+    try:
+        entries = list(os.scandir(WEB_CACHE_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def _cache_put(url: str, text: str) -> None:
+    _cache_remember(url, time.time(), text)
+    _prune_disk_cache()
+    path = _cache_path(url)
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=1) as fh:
+            fh.write(text)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _fetch_raw(
+    url: str,
+    timeout: int = 15,
+    keep: Callable[[str], bool] | None = None,
+) -> str:
+    """Fetch raw HTML from a URL, through the page cache.
+
+    A fresh page is cached only if *keep* (when given) accepts it.
+    """
+    if WEB_CACHE:
+        cached = _cache_get(url)
+        if cached is not None:
+            return cached
+    text = _fetch_url(url, timeout)
+    if WEB_CACHE and (keep is None or keep(text)):
+        _cache_put(url, text)
+    return text
+
+
+def _fetch_url(url: str, timeout: int = 15) -> str:
+    """Fetch raw HTML from a URL over the shared connection pool.
+
+    The (inflated) body is streamed and cut at _MAX_FETCH_BYTES; HTTP error
+    statuses raise, as urlopen did.
+    """
+    with _http.stream("GET", url, timeout=timeout) as resp:
+        resp.raise_for_status()
+        data = bytearray()
+        for chunk in resp.iter_bytes():
+            data += chunk
+            if len(data) >= _MAX_FETCH_BYTES:
+                del data[_MAX_FETCH_BYTES:]
+                break
+        charset = resp.charset_encoding or "utf-8"
+    return data.decode(charset, errors="replace")
+
+
+def _parse_ddg_lite(html: str, max_results: int) -> list[dict[str, str]]:
+    """Result rows from a DuckDuckGo Lite page.
+
+    Results are <a class="result-link"> anchors, each followed by a
+    <td class="result-snippet">; the n-th snippet belongs to the n-th link.
+    """
+    results: list[dict[str, str]] = []
+
+    if LexborHTMLParser is not None:
+        # One C parse; text() drops inner tags and decodes entities.
+        # (text(strip=True) strips every text node, gluing words together.)
+        tree = LexborHTMLParser(html)
+        snippets = tree.css("td.result-snippet")
+        for i, link in enumerate(tree.css("a.result-link")[:max_results]):
+            results.append({
+                "title": link.text().strip(),
+                "url": link.attributes.get("href") or "",
+                "snippet": snippets[i].text().strip() if i < len(snippets) else "",
+            })
+        return results
+
+    links = _DDG_LINK_RE.findall(html)
+    snippets = _DDG_SNIPPET_RE.findall(html)
+
+    for i, (href, title) in enumerate(links[:max_results]):
+        title_clean = _TAG_RE.sub("", title).strip()
+        snippet_clean = ""
+        if i < len(snippets):
+            snippet_clean = _TAG_RE.sub("", snippets[i]).strip()
+        results.append({
+            "title": title_clean,
+            "url": href,
+            "snippet": snippet_clean,
+        })
+    return results
 
 
 # ── Public API ─────────────────────────────────────────────────────
 
+def _parse_ddg_json(raw: str, max_results: int) -> list[dict[str, str]]:
+    """Results from a DuckDuckGo Instant Answer API reply's RelatedTopics."""
+    results: list[dict[str, str]] = []
+    for topic in _json_loads(raw).get("RelatedTopics", [])[:max_results]:
+        if "Text" in topic:
+            results.append({
+                "title": topic.get("Text", "")[:80],
+                "url": topic.get("FirstURL", ""),
+                "snippet": topic.get("Text", ""),
+            })
+    return results
+
+
 def web_search(query: str, max_results: int = 5) -> list[dict[str, str]]:
     """
     Search the web using DuckDuckGo Lite (no API key required).
@@ -103,45 +373,18 @@ def web_search(query: str, max_results: int = 5) -> list[dict[str, str]]:
     try:
         encoded = urllib.parse.urlencode({"q": query})
         url = f"https://lite.duckduckgo.com/lite/?{encoded}"
-        html = _fetch_raw(url, timeout=10)
+        # Search pages are cached only if they hold results: a challenge
+        # or empty-result page still returns 200 and must not stick
+        html = _fetch_raw(url, timeout=10, keep=lambda page: bool(_parse_ddg_lite(page, 1)))
 
-        results: list[dict[str, str]] = []
         # Parse DDG Lite results — they use a table with class "result-link"
-        link_pattern = re.compile(
-            r'<a[^>]+class="result-link"[^>]*href="([^"]+)"[^>]*>(.*?)</a>',
-            re.DOTALL,
-        )
-        snippet_pattern = re.compile(
-            r'<td[^>]+class="result-snippet"[^>]*>(.*?)</td>',
-            re.DOTALL,
-        )
-
-        links = link_pattern.findall(html)
-        snippets = snippet_pattern.findall(html)
-
-        for i, (href, title) in enumerate(links[:max_results]):
-            title_clean = re.sub(r"<[^>]+>", "", title).strip()
-            snippet_clean = ""
-            if i < len(snippets):
-                snippet_clean = re.sub(r"<[^>]+>", "", snippets[i]).strip()
-            results.append({
-                "title": title_clean,
-                "url": href,
-                "snippet": snippet_clean,
-            })
+        results = _parse_ddg_lite(html, max_results)
 
         if not results:
             # Fallback: try DuckDuckGo JSON API (limited but sometimes works)
             api_url = f"https://api.duckduckgo.com/?q={urllib.parse.quote(query)}&format=json&no_html=1"
-            raw = _fetch_raw(api_url, timeout=10)
-            data = json.loads(raw)
-            for topic in data.get("RelatedTopics", [])[:max_results]:
-                if "Text" in topic:
-                    results.append({
-                        "title": topic.get("Text", "")[:80],
-                        "url": topic.get("FirstURL", ""),
-                        "snippet": topic.get("Text", ""),
-                    })
+            raw = _fetch_raw(api_url, timeout=10, keep=lambda page: bool(_parse_ddg_json(page, 1)))
+            results = _parse_ddg_json(raw, max_results)
 
         return results or [{"title": "No results found", "url": "", "snippet": ""}]
 
@@ -162,17 +405,16 @@ def fetch_page(url: str, max_chars: int = 15000) -> str:
         html = _fetch_raw(url, timeout=15)
 
         # If it looks like JSON, return it directly
-        if url.endswith(".json") or html.strip().startswith("{"):
+        if url.endswith(".json") or _JSON_START_RE.match(html):
             return html[:max_chars]
 
-        # If it looks like plain text / markdown
-        if url.endswith((".md", ".txt", ".rst")) or "<html" not in html.lower()[:500]:
+        # If it looks like plain text / markdown (only the head is lowered,
+        # not a copy of the whole page)
+        if url.endswith((".md", ".txt", ".rst")) or "<html" not in html[:500].lower():
             return html[:max_chars]
 
         # Parse HTML to text
-        extractor = _TextExtractor()
-        extractor.feed(html)
-        text = extractor.get_text()
+        text = _extract_text(html, max_chars)
 
         return text[:max_chars] if text else "(page returned no extractable text)"
 
@@ -197,12 +439,9 @@ def search_and_summarize(query: str) -> str:
     parts = [f"Web search: {query}\n"]
 
     for i, r in enumerate(results, 1):
-        parts.append(f"  {i}. {r['title']}")
-        if r["url"]:
-            parts.append(f"     {r['url']}")
-        if r["snippet"]:
-            parts.append(f"     {r['snippet'][:150]}")
-        parts.append("")
+        url = f"\n     {r['url']}" if r["url"] else ""
+        snippet = f"\n     {r['snippet'][:150]}" if r["snippet"] else ""
+        parts.append(f"  {i}. {r['title']}{url}{snippet}\n")
 
     # Fetch the top result for full context
     top_url = next((r["url"] for r in results if r["url"]), None)
@@ -280,14 +519,24 @@ _TECH_DOCS: dict[str, list[str]] = {
 }
 
 
-def _extract_technologies(prompt: str) -> list[str]:
-    """Extract technology keywords from a prompt for targeted doc lookup."""
+# Official-docs pages are cached longer (WEB_CACHE_DOCS_TTL)
+_TECH_DOCS_HOSTS = frozenset(
+    urllib.parse.urlsplit(url).hostname
+    for urls in _TECH_DOCS.values()
+    for url in urls
+)
+
+
+@functools.lru_cache(maxsize=128)
+def _extract_technologies(prompt: str) -> tuple[str, ...]:
+    """Extract technology keywords from a prompt for targeted doc lookup.
+
+    Memoized, so the result is a tuple that callers can't mutate.
+    """
+    # Each test is a C substring search; keys overlap ("next"/"nextjs") and
+    # both must be reported, in table order
     lower = prompt.lower()
-    found: list[str] = []
-    for tech in _TECH_DOCS:
-        if tech in lower:
-            found.append(tech)
-    return found
+    return tuple(tech for tech in _TECH_DOCS if tech in lower)
 
 
 def fetch_tech_docs(
@@ -297,22 +546,40 @@ def fetch_tech_docs(
 ) -> dict[str, str]:
     """Fetch official documentation for specific technologies.
 
-    Returns a dict of {technology: doc_content}.
+    Returns a dict of {technology: doc_content}. Aliases that share a docs
+    page ("next" / "nextjs") are fetched and reported once.
     """
     if not _internet_allowed:
         return {}
 
-    docs: dict[str, str] = {}
-    for tech in technologies:
-        urls = _TECH_DOCS.get(tech, [])
-        for url in urls[:max_per_tech]:
+    # Each tech's candidate URLs, minus those an earlier alias already owns
+    jobs: list[tuple[str, list[str]]] = []
+    seen_urls: set[str] = set()
+    for tech in dict.fromkeys(technologies):
+        urls = [u for u in _TECH_DOCS.get(tech, [])[:max_per_tech] if u not in seen_urls]
+        if urls:
+            seen_urls.update(urls)
+            jobs.append((tech, urls))
+    if not jobs:
+        return {}
+
+    def first_page(urls: list[str]) -> str | None:
+        for url in urls:
             try:
                 content = fetch_page(url, max_chars=max_chars)
                 if content and not content.startswith("[Failed"):
-                    docs[tech] = content
-                    break
+                    return content
             except Exception:
                 continue
+        return None
+
+    # Techs are fetched concurrently; map() keeps the report in tech order
+    docs: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=min(_FETCH_WORKERS, len(jobs))) as pool:
+        pages = pool.map(first_page, [urls for _, urls in jobs])
+        for (tech, _), content in zip(jobs, pages):
+            if content is not None:
+                docs[tech] = content
 
     return docs
 
@@ -346,14 +613,29 @@ def research_task(
         console.print(f"  [dim]   Technologies detected: {', '.join(technologies)}[/dim]")
 
     # 2. Generate search queries
-    queries = _generate_search_queries(prompt, technologies)
-
-    # 3. Web search for each query
-    all_results: list[dict[str, str]] = []
-    for i, query in enumerate(queries[:max_search_queries]):
-        console.print(f"  [dim]   Searching: {query}[/dim]")
-        results = web_search(query, max_results=3)
-        all_results.extend(results)
+    queries = list(dict.fromkeys(
+        _generate_search_queries(prompt, technologies)
+    ))[:max_search_queries]
+    # Pages the official-docs step reads itself; search hits on them are skipped
+    docs_urls = {url for tech in technologies for url in _TECH_DOCS.get(tech, [])}
+
+    with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as pool:
+        # Official docs don't depend on the searches; start them first
+        docs_future = None
+        if technologies:
+            console.print(f"  [dim]   Fetching official docs...[/dim]")
+            docs_future = pool.submit(fetch_tech_docs, technologies, max_chars=4000)
+
+        # 3. Web search for each query — all in flight at once; map()
+        #    keeps query order
+        for query in queries:
+            console.print(f"  [dim]   Searching: {query}[/dim]")
+        all_results: list[dict[str, str]] = []
+        for results in pool.map(lambda q: web_search(q, max_results=3), queries):
+            all_results.extend(results)
+
+        pages = _fetch_top_pages(pool, all_results, max_doc_pages, skip=docs_urls)
+        tech_docs = docs_future.result() if docs_future else {}
 
     # Format search results
     if all_results:
@@ -362,32 +644,17 @@ def research_task(
         for r in all_results:
             if r["url"] and r["url"] not in seen_urls:
                 seen_urls.add(r["url"])
-                parts.append(f"- **{r['title']}**")
-                parts.append(f"  {r['snippet'][:200]}")
-                parts.append(f"  URL: {r['url']}\n")
-
-    # 4. Fetch top search result pages (up to max_doc_pages)
-    fetched = 0
-    for r in all_results:
-        if fetched >= max_doc_pages:
-            break
-        url = r.get("url", "")
-        if not url:
-            continue
-        console.print(f"  [dim]   Reading: {url[:60]}...[/dim]")
-        content = fetch_page(url, max_chars=4000)
-        if content and not content.startswith("[Failed"):
-            parts.append(f"\n## Page: {r['title']}\n")
-            parts.append(content[:4000])
-            fetched += 1
-
-    # 5. Fetch official docs
-    if technologies:
-        console.print(f"  [dim]   Fetching official docs...[/dim]")
-        tech_docs = fetch_tech_docs(technologies, max_chars=4000)
-        for tech, content in tech_docs.items():
-            parts.append(f"\n## Official Docs: {tech}\n")
-            parts.append(content[:4000])
+                parts.append(
+                    f"- **{r['title']}**\n  {r['snippet'][:200]}\n  URL: {r['url']}\n"
+                )
+
+    # 4. Top search result pages (up to max_doc_pages)
+    for title, content in pages:
+        parts.append(f"\n## Page: {title}\n\n{content[:4000]}")
+
+    # 5. Official docs
+    for tech, content in tech_docs.items():
+        parts.append(f"\n## Official Docs: {tech}\n\n{content[:4000]}")
 
     research_text = "\n".join(parts)
 
@@ -403,8 +670,42 @@ def research_task(
     return research_text
 
 
-def _generate_search_queries(prompt: str, technologies: list[str]) -> list[str]:
-    """Generate targeted search queries from the task prompt."""
+def _fetch_top_pages(
+    pool: ThreadPoolExecutor,
+    results: list[dict[str, str]],
+    max_pages: int,
+    skip: set[str] = frozenset(),
+) -> list[tuple[str, str]]:
+    """Read up to *max_pages* search results as (title, text), in result order.
+
+    Each URL is read at most once, and URLs in *skip* not at all. Pages are
+    fetched concurrently, as many at a time as are still needed; a failed
+    fetch is replaced by the next result, as a sequential loop would do.
+    """
+    seen = set(skip)
+    candidates = []
+    for r in results:
+        url = r.get("url")
+        if url and url not in seen:
+            seen.add(url)
+            candidates.append(r)
+    pages: list[tuple[str, str]] = []
+    start = 0
+    while len(pages) < max_pages and start < len(candidates):
+        batch = candidates[start:start + max_pages - len(pages)]
+        start += len(batch)
+        for r in batch:
+            console.print(f"  [dim]   Reading: {r['url'][:60]}...[/dim]")
+        contents = pool.map(lambda r: fetch_page(r["url"], max_chars=4000), batch)
+        for r, content in zip(batch, contents):
+            if content and not content.startswith("[Failed"):
+                pages.append((r["title"], content))
+    return pages
+
+
+@functools.lru_cache(maxsize=128)
+def _generate_search_queries(prompt: str, technologies: tuple[str, ...]) -> tuple[str, ...]:
+    """Generate targeted search queries from the task prompt (memoized)."""
     queries: list[str] = []
 
     # Main task query
@@ -430,4 +731,4 @@ def _generate_search_queries(prompt: str, technologies: list[str]) -> list[str]:
     if "docker" in lower:
         queries.append("Dockerfile best practices multi-stage build")
 
-    return queries[:5]  # Cap at 5 queries
+    return tuple(queries[:5])  # Cap at 5 queries
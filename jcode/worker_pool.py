@@ -20,6 +20,7 @@ from __future__ import annotations
 import os
 import time
 import threading
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, Future
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -35,8 +36,21 @@ from jcode.config import (
     WORKER_POLL_INTERVAL,
 )
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 console = Console()
 
+
+def _usable_cpus() -> int:
+    """CPUs this process may run on (honours affinity masks / cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
 T = TypeVar("T")
 
 
@@ -54,7 +68,8 @@ class WorkerPool:
     """
     Adaptive thread pool with CPU-aware concurrency.
 
-    - Starts with MAX_WORKERS threads
+    - Runs at most `current_concurrency` tasks at once (up to MAX_WORKERS);
+      the rest wait in a queue, not in a blocked thread
     - Monitors CPU usage and adjusts concurrency
     - Provides submit_batch / collect API
     - Thread-safe via internal locks
@@ -63,10 +78,13 @@ class WorkerPool:
     def __init__(self, max_workers: int | None = None) -> None:
         self._max = max_workers or MAX_WORKERS
         self._current_workers = min(self._max, 4)  # Start moderate
+        # Threads start on demand, so only as many exist as tasks were ever
+        # dispatched at once
         self._executor = ThreadPoolExecutor(max_workers=self._max)
         self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
         self._active_count = 0
-        self._semaphore = threading.Semaphore(self._current_workers)
+        self._pending: deque[tuple[Future, Callable[[], None]]] = deque()
         self._monitor_thread: threading.Thread | None = None
         self._shutdown = False
 
@@ -75,6 +93,10 @@ class WorkerPool:
 
     def _start_monitor(self) -> None:
         """Start background CPU monitoring thread."""
+        if psutil is not None:
+            # Prime the non-blocking counter: each later call reports usage
+            # since the previous one, i.e. over one poll interval
+            psutil.cpu_percent(interval=None)
         self._monitor_thread = threading.Thread(
             target=self._cpu_monitor_loop, daemon=True
         )
@@ -92,13 +114,10 @@ class WorkerPool:
                     elif cpu < CPU_LOW_THRESHOLD and self._current_workers < self._max:
                         self._current_workers = min(self._max, self._current_workers + 1)
 
-                    if self._current_workers != old:
-                        # Adjust semaphore
-                        diff = self._current_workers - old
-                        if diff > 0:
-                            for _ in range(diff):
-                                self._semaphore.release()
-                        # If shrinking, the semaphore will naturally block new acquisitions
+                    if self._current_workers > old:
+                        self._dispatch()
+                    # If shrinking, running tasks finish and _dispatch holds
+                    # back queued ones until active drops below the new limit
             except Exception:
                 pass
             time.sleep(WORKER_POLL_INTERVAL)
@@ -106,17 +125,33 @@ class WorkerPool:
     @staticmethod
     def _get_cpu_usage() -> float:
         """Get current CPU usage percentage. Cross-platform."""
+        if psutil is not None:
+            # Non-blocking: usage since the previous call
+            return psutil.cpu_percent(interval=None)
+        # Fallback: use os.getloadavg on Unix
         try:
-            import psutil
-            return psutil.cpu_percent(interval=0.5)
-        except ImportError:
-            # Fallback: use os.getloadavg on Unix
-            try:
-                load1, _, _ = os.getloadavg()
-                cpu_count = os.cpu_count() or 1
-                return min(100.0, (load1 / cpu_count) * 100.0)
-            except (OSError, AttributeError):
-                return 50.0  # Assume moderate if we can't measure
+            load1, _, _ = os.getloadavg()
+            return min(100.0, (load1 / _usable_cpus()) * 100.0)
+        except (OSError, AttributeError):
+            return 50.0  # Assume moderate if we can't measure
+
+    def _dispatch(self) -> None:
+        """Hand queued tasks to the executor while under the concurrency
+        limit. Caller holds _lock."""
+        while self._pending and self._active_count < self._current_workers:
+            future, run = self._pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued
+            self._active_count += 1
+            self._executor.submit(run)
+
+    def _task_done(self) -> None:
+        """Free a slot and start the next queued task."""
+        with self._lock:
+            self._active_count -= 1
+            self._dispatch()
+            if not self._active_count and not self._pending:
+                self._idle.notify_all()
 
     def submit(
         self,
@@ -126,37 +161,42 @@ class WorkerPool:
         **kwargs: Any,
     ) -> Future[WorkerResult]:
         """Submit a single task to the pool with concurrency throttling."""
+        future: Future[WorkerResult] = Future()
 
-        def _wrapped() -> WorkerResult:
-            # Acquire semaphore to respect concurrency limit
-            self._semaphore.acquire()
-            with self._lock:
-                self._active_count += 1
-
-            start = time.monotonic()
+        def _wrapped() -> None:
+            start = time.perf_counter_ns()
             try:
                 result = fn(*args, **kwargs)
-                elapsed = int((time.monotonic() - start) * 1000)
-                return WorkerResult(
+                elapsed = (time.perf_counter_ns() - start) // 1_000_000
+                outcome = WorkerResult(
                     task_id=task_id,
                     success=True,
                     result=result,
                     duration_ms=elapsed,
                 )
             except Exception as e:
-                elapsed = int((time.monotonic() - start) * 1000)
-                return WorkerResult(
+                elapsed = (time.perf_counter_ns() - start) // 1_000_000
+                outcome = WorkerResult(
                     task_id=task_id,
                     success=False,
                     error=str(e),
                     duration_ms=elapsed,
                 )
-            finally:
-                with self._lock:
-                    self._active_count -= 1
-                self._semaphore.release()
+            except BaseException as e:
+                # Resolve the future before freeing the slot, so a failure
+                # in dispatching the next task can't strand this one
+                future.set_exception(e)
+                self._task_done()
+                raise
+            future.set_result(outcome)
+            self._task_done()
 
-        return self._executor.submit(_wrapped)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._pending.append((future, _wrapped))
+            self._dispatch()
+        return future
 
     def submit_batch(
         self,
@@ -188,25 +228,34 @@ class WorkerPool:
                 results.append(result)
             except Exception as e:
                 results.append(WorkerResult(
-                    task_id=-1, success=False, error=str(e),
+                    task_id=-1, success=False, error=str(e) or type(e).__name__,
                 ))
         return results
 
     @property
     def active_count(self) -> int:
         """Number of currently active workers."""
-        with self._lock:
-            return self._active_count
+        # Only written under _lock; a single attribute read needs no lock
+        return self._active_count
 
     @property
     def current_concurrency(self) -> int:
         """Current concurrency limit (may be adjusted by CPU monitor)."""
-        with self._lock:
-            return self._current_workers
+        return self._current_workers
 
     def shutdown(self, wait: bool = True) -> None:
-        """Shutdown the pool."""
-        self._shutdown = True
+        """Shutdown the pool. With wait=True, queued tasks run first;
+        otherwise they are cancelled and only running tasks finish."""
+        with self._lock:
+            self._shutdown = True
+            if wait:
+                self._dispatch()
+                while self._pending or self._active_count:
+                    self._idle.wait()
+            else:
+                while self._pending:
+                    future, _ = self._pending.popleft()
+                    future.cancel()
         self._executor.shutdown(wait=wait)
 
     def __enter__(self) -> "WorkerPool":